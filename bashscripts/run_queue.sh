@@ -0,0 +1,33 @@
+#! /bin/bash
+# queue every (env, index) configuration at the granularity of test points
+# and drain the queue with workers; usage:
+#   ./run_queue.sh QUEUE_DIR N          -- N local workers, no scheduler
+#   ./run_queue.sh QUEUE_DIR N sbatch   -- N Slurm workers
+# results are put into data/<name>/ by "python ../src/workqueue.py merge QUEUE_DIR"
+
+queue=${1:-queue}
+workers=${2:-1}
+
+envs=("compas_ood" "compas_ood1" "compas_shapood" "compas_shapood1" "german_lmodified" "german_smodified" "compas_shapood" "compas_shapood1")
+num=("100" "100" "100" "100" "50" "50" "50" "50")
+
+cd ..
+
+for index in 0 1 2 3 4 5 6 7 8 9
+do
+    for id in 0 1 2 3 4 5 6 7
+    do
+        python src/workqueue.py populate ${queue} -e smt -s z3 --xnum 200 -a "datasets/${envs[id]}/config_num.yml" "temp/${envs[id]}_${index}/${envs[id]}_${index}_nbestim_${num[id]}_maxdepth_3_testsplit_0.2.mod.pkl" "datasets/${envs[id]}_${index}/${envs[id]}_${index}_test.csv"
+    done
+done
+
+for worker in $(seq 1 ${workers})
+do
+    if [ "${3}" == "sbatch" ]; then
+        sbatch --time=04-01:00:00  --cpus-per-task=2 --ntasks-per-node=1 --mem-per-cpu=9000  --partition=longq  --wrap="python src/workqueue.py work ${queue}"
+    else
+        python src/workqueue.py work ${queue} > ${queue}.worker${worker}.log 2>&1 &
+    fi
+done
+
+wait
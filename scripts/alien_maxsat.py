@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+import getopt
+import os
+import sys
+
+from pysat.examples.rc2 import RC2Stratified
+from pysat.formula import WCNF
+
+
+def usage():
+    print('Usage:', os.path.basename(sys.argv[0]), '[-i] formula.wcnf')
+    print('A stand-in alien MaxSAT solver (RC2) for the mxa oracle. By default, it solves the formula')
+    print('once. With -i, it reads the formula once and then solves it under the literals of every')
+    print('line \'a <literals> 0\' read from its standard input, as expected by --persist. Options:')
+    print('        -h                         Show this message')
+    print('        -i                         Incremental mode, required with --persist, e.g.')
+    print('                                   -e mxa --persist -s \'scripts/alien_maxsat.py -i\'')
+    print('                                   (the usual MaxSAT solvers do not read this protocol)')
+
+
+def solve(formula, assumps):
+    with RC2Stratified(formula, solver='g3', blo='div', verbose=0) as rc2:
+        for lit in assumps:
+            rc2.add_clause([lit])
+
+        model = rc2.compute()
+
+        if model is None:
+            print('s UNSATISFIABLE')
+        else:
+            print('o {0}'.format(rc2.cost))
+            print('s OPTIMUM FOUND')
+            print('v {0}'.format(' '.join([str(l) for l in model])))
+
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'hi')
+    except getopt.GetoptError as err:
+        sys.stderr.write(str(err).capitalize() + '\n')
+        usage()
+        sys.exit(1)
+
+    incremental = False
+    for opt, arg in opts:
+        if opt == '-h':
+            usage()
+            sys.exit(0)
+        elif opt == '-i':
+            incremental = True
+
+    if len(args) != 1:
+        usage()
+        sys.exit(1)
+
+    formula = WCNF(from_file=args[0])
+
+    if not incremental:
+        solve(formula, [])
+    else:
+        # one call per line, until the standard input is closed
+        for line in sys.stdin:
+            if line.startswith('a '):
+                solve(formula, [int(l) for l in line[2:].split()[:-1]])
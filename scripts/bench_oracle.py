@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from data import Data
+import numpy as np
+from options import Options
+from xgbooster import ExplainSession
+from xreason_agg import get_categorical_features
+
+
+def usage():
+    print('Usage:', os.path.basename(sys.argv[0]), '[-p points] [-k calls] [xreason_agg options] model.pkl test.csv')
+    print('Compares the PySMT (z3) and the native (z3native) Z3 oracles of the SMT explainer:')
+    print('the time spent explaining the first points of the test set, the number of oracle')
+    print('calls, and the time of a single call made with all the hypotheses as assumptions')
+
+
+def bench(argv, solver, npoints, ncalls):
+    options = Options(['xreason_agg.py', '-s', solver] + argv)
+    model = options.files[0]
+
+    data = Data(filename=options.files[1], mapfile=options.mapfile,
+                separator=options.separator, use_categorical=options.use_categorical)
+    X = np.asarray(data.samps, dtype=np.float32)[:npoints, 0:len(data.names) - 1]
+
+    session = ExplainSession(options, model, categorical_features=get_categorical_features(model))
+
+    expls, calls, start = [], 0, time.time()
+    for point in X:
+        expl, _, _ = session.explain(point)
+        expls.append(sorted([sorted(e) for e in expl if e is not None]))
+        calls += session.xgb.x.calls
+    total = time.time() - start
+
+    # per-call cost on the last point: an UNSAT call (entailment)
+    # and a SAT call followed by reading the values of all inputs
+    x = session.xgb.x
+
+    start = time.time()
+    for i in range(ncalls):
+        x.oracle.solve([x.selv] + x.rhypos)
+    unsat = (time.time() - start) / ncalls
+
+    start = time.time()
+    for i in range(ncalls):
+        x.oracle.solve([x.selv])
+        model = x.oracle.get_model()
+        for inp in x.inps:
+            model.get_py_value(inp)
+    sat = (time.time() - start) / ncalls
+
+    # the explanations are comparable only if all of them were enumerated
+    capped = options.xnum > 0 and any([len(e) >= options.xnum for e in expls])
+
+    return expls, calls, total, unsat, sat, capped
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    npoints, ncalls = 20, 200
+
+    while args and args[0] in ('-p', '-k', '-h'):
+        if args[0] == '-h':
+            usage()
+            sys.exit(0)
+        elif args[0] == '-p':
+            npoints = int(args[1])
+        else:
+            ncalls = int(args[1])
+        args = args[2:]
+
+    if len(args) < 2:
+        usage()
+        sys.exit(1)
+
+    results = {}
+    for solver in ('z3', 'z3native'):
+        results[solver] = bench(args, solver, npoints, ncalls)
+
+    print('')
+    print('{0:<10} {1:>10} {2:>8} {3:>12} {4:>12} {5:>14}'.format('oracle', 'time', 'calls',
+        'ms/call', 'unsat ms', 'sat+model ms'))
+    for solver in ('z3', 'z3native'):
+        expls, calls, total, unsat, sat, capped = results[solver]
+        print('{0:<10} {1:>9.2f}s {2:>8} {3:>12.3f} {4:>12.3f} {5:>14.3f}'.format(solver, total, calls,
+            1000 * total / max(calls, 1), 1000 * unsat, 1000 * sat))
+
+    if results['z3'][-1] or results['z3native'][-1]:
+        # which explanations are found first depends on the models
+        # returned by Z3, which depend on the order its terms were created
+        print('same explanations: not comparable (enumeration stopped by --xnum)')
+    else:
+        same = results['z3'][0] == results['z3native'][0]
+        print('same explanations: {0}'.format('yes' if same else 'no'))
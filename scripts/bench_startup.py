@@ -0,0 +1,84 @@
+import getopt
+import os
+import subprocess
+import sys
+import time
+
+
+# packages that must not be loaded just to start up the entry points;
+# they belong to the modes (training, LIME, SHAP, Anchor, SMT, ...) using them
+HEAVY = ['anchor', 'anchor_wrap', 'lime', 'lime_wrap', 'pandas', 'pysmt',
+         'shap', 'shap_wrap', 'sklearn', 'xgboost', 'yaml']
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = [
+    ('import xgbooster', ['-c', 'import xgbooster']),
+    ('xreason.py -h', [os.path.join(root, 'src', 'xreason.py'), '-h']),
+    ('xreason_agg.py -h', [os.path.join(root, 'src', 'xreason_agg.py'), '-h']),
+    ('workqueue.py -h', [os.path.join(root, 'src', 'workqueue.py'), '-h']),
+]
+
+
+def run(args):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.join(root, 'src')] +
+                                        ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+
+    start = time.time()
+    proc = subprocess.Popen([sys.executable, '-X', 'importtime'] + args, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True)
+    _, err = proc.communicate()
+    wall = time.time() - start
+
+    # lines of the form "import time: self [us] | cumulative | imported package"
+    loaded = set()
+    for line in err.splitlines():
+        if line.startswith('import time:') and not line.endswith('imported package'):
+            loaded.add(line.split('|')[-1].strip().split('.')[0])
+
+    return wall, sorted(loaded.intersection(HEAVY))
+
+
+def usage():
+    print('Usage:', os.path.basename(sys.argv[0]), '[options]')
+    print('Options:')
+    print('        -h, --help                 Show this message')
+    print('        -l, --limit=<float>        Fail if the startup of a case takes longer (in seconds)')
+    print('        -r, --runs=<int>           Number of runs per case; the best one is reported (default = 3)')
+
+
+if __name__ == '__main__':
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'hl:r:', ['help', 'limit=', 'runs='])
+    except getopt.GetoptError as err:
+        sys.stderr.write(str(err).capitalize() + '\n')
+        usage()
+        sys.exit(1)
+
+    limit, runs = None, 3
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit(0)
+        elif opt in ('-l', '--limit'):
+            limit = float(arg)
+        elif opt in ('-r', '--runs'):
+            runs = int(arg)
+
+    failed = False
+    for name, args in CASES:
+        results = [run(args) for i in range(runs)]
+        wall, heavy = min(results)
+
+        status = 'ok'
+        if heavy:
+            status = 'loads ' + ', '.join(heavy)
+        elif limit and wall > limit:
+            status = 'too slow'
+
+        failed = failed or status != 'ok'
+        print('{0:<24} {1:>8.3f}s  {2}'.format(name, wall, status))
+
+    sys.exit(1 if failed else 0)
@@ -25,7 +25,7 @@ if __name__=='__main__':
         if results.get(name) is None:
             results[name]={}
         for f in os.listdir(expl_dir + dir):
-            if "mwc_expls" in f:
+            if f.endswith("mwc_expls.pkl"):
                 f_path = expl_dir + dir + "/" + f
                 if results[name].get(RESPONSIBILITY) is None:
                     results[name][RESPONSIBILITY] = []
@@ -38,7 +38,7 @@ if __name__=='__main__':
                 results[name][HOLLER].append(e_holler)
                 results[name][DEEGAN].append(e_deegan)
 
-            elif "lime_expls" in f:
+            elif f.endswith("lime_expls.pkl"):
                 f_path = expl_dir + dir + "/" + f
                 lime_exp = compute_lime_explanations(dataset_name, f_path)
                 if results[name].get(LIME) is None:
@@ -47,7 +47,7 @@ if __name__=='__main__':
 
 
 
-            elif "shap_expls" in f:
+            elif f.endswith("shap_expls.pkl"):
                 f_path = expl_dir + dir + "/" + f
                 shap_exp = compute_shap_explanations(dataset_name, f_path)
                 if results[name].get(SHAP) is None:
@@ -9,18 +9,15 @@
 ##
 
 #
-import resource
 #==============================================================================
 # from __future__ import print_function
 from aggrxp.src.data import Data
-from anchor_wrap import anchor_call
-from lime_wrap import lime_call
-from shap_wrap import shap_call
 from options import Options
 import numpy as np
 import os
 import sys
-from xgbooster import XGBooster, preprocess_dataset
+from xgbooster import ExplainSession, XGBooster
+from xreason_agg import get_explainers
 
 
 #
@@ -40,63 +37,22 @@ def multi_run_wrapper(args):
    return compute(*args)
 
 
-def compute(xgb,point,options,idx,fname,dirname,true_y):
-
-
-    expl_file = None
-    point_ = [round(float(x),2) for x in point]
-    if options.uselime or options.useanchor or options.useshap:
-        xgb = XGBooster(options, from_model=options.files[0], categorical_features=categorical_feature_names)
-    else:
-        # abduction-based approach requires an encoding
-        xgb = XGBooster(options, from_model=options.files[0], categorical_features=categorical_feature_names)
-
-    # read a sample from options.explain
-    print("options_explain",options.explain)
-    if options.explain:
-        options.explain = point_
-
-
-    if options.encode:
-        # if not xgb:
-
-        # encode it and save the encoding to another file
-        xgb.encode(test_on=point_)
-
-
-    print("point",point_)
-    feat_sample_exp = np.expand_dims(point_, axis=0)
-    feat_sample_tr = xgb.transform(feat_sample_exp)
-
-    if options.attack:
-        y_pred = xgb.predict(feat_sample_exp)[0]
-    else:
-        y_pred = xgb.model.predict(feat_sample_tr)[0]
-
-    time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-           resource.getrusage(resource.RUSAGE_SELF).ru_utime
-
-
-    expl_ = xgb.explain(point_,
-                       use_lime=lime_call if options.uselime else None,
-                       use_anchor=anchor_call if options.useanchor else None,
-                       use_shap=shap_call if options.useshap else None,
-                       nof_feats=options.limefeats,attack=options.attack)
-
-
+# explanation session of this process
+session = None
 
+def compute(xgb,point,options,idx,fname,dirname,true_y):
+    global session
 
-    time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-           resource.getrusage(resource.RUSAGE_SELF).ru_utime - time
-    if options.uselime==True or options.useshap==True:
-        expl = expl_[0]
-        y_pred =  expl_[1]
+    if session is None:
+        # the model, its encoding and the explainer are loaded only once
+        session = ExplainSession(options, options.files[0], categorical_features=categorical_feature_names)
 
-    else:
-        expl = expl_
+    use_lime, use_anchor, use_shap = get_explainers(options)
 
-    if (options.uselime or options.useanchor or options.useshap) and options.validate:
-        xgb.validate(options.explain, expl)
+    print("point",[round(float(x),2) for x in point])
+    expl, y_pred, time = session.explain(point, use_lime=use_lime,
+                       use_anchor=use_anchor, use_shap=use_shap,
+                       nof_feats=options.limefeats)
 
     return (point,idx,expl,y_pred,true_y,time)
 
@@ -118,6 +74,7 @@ if __name__ == '__main__':
 
     if (options.preprocess_categorical):
         print("here")
+        from xgbooster import preprocess_dataset
         preprocess_dataset(options.files[0], options.preprocess_categorical_files)
         exit()
 
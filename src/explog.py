@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## explog.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from __future__ import print_function
+import joblib
+import json
+import os
+import pickle
+import sys
+
+
+#
+#==============================================================================
+class ExplanationLog(object):
+    """
+        Append-only log of explained points. Every record is pickled on its
+        own, so writing a record costs the same no matter how long the run
+        is, and a killed run loses at most the record being written.
+    """
+
+    def __init__(self, filename):
+        """
+            Constructor.
+        """
+
+        self.fname = filename
+        self.fp = None
+
+        # offset of the end of the last complete record
+        self.tail = 0
+
+    def __del__(self):
+        """
+            Destructor.
+        """
+
+        self.close()
+
+    def records(self):
+        """
+            Read all the complete records of the log. A partially written
+            last record (e.g. if the job was killed) is ignored.
+        """
+
+        recs, self.tail = [], 0
+
+        if os.path.exists(self.fname):
+            with open(self.fname, 'rb') as fp:
+                while True:
+                    try:
+                        recs.append(pickle.load(fp))
+                    except EOFError:
+                        break
+                    except (pickle.UnpicklingError, AttributeError,
+                            ValueError, IndexError):
+                        # truncated record
+                        break
+
+                    self.tail = fp.tell()
+
+        return recs
+
+    def done(self):
+        """
+            Indices of the points present in the log.
+        """
+
+        return set([rec['idx'] for rec in self.records()])
+
+    def open(self, resume=False):
+        """
+            Open the log for appending. Unless resuming, the previous
+            contents of the log are discarded.
+        """
+
+        if resume:
+            # dropping a partially written record, if any
+            self.records()
+
+            self.fp = open(self.fname, 'ab')
+            self.fp.truncate(self.tail)
+        else:
+            self.fp = open(self.fname, 'wb')
+
+    def append(self, idx, weight, result, info=None):
+        """
+            Append the record of one explained point. Extra information on
+            the point (e.g. whether its explanations are complete) can be
+            given as a dictionary.
+        """
+
+        pickle.dump({'idx': idx, 'weight': weight, 'result': result,
+            'info': info if info else {}}, self.fp)
+        self.fp.flush()
+
+    def close(self):
+        """
+            Close the log.
+        """
+
+        if self.fp:
+            self.fp.close()
+            self.fp = None
+
+    def compact(self, expls_file, points_file=None, options=None,
+            info_file=None):
+        """
+            Produce the *_expls.pkl (and *_points.pkl) layout out of the log.
+            Results are ordered by idx and each of them is replicated as
+            many times as the weight of its row. The extra information on
+            the points goes to a JSON file indexed by idx.
+        """
+
+        # the last record wins if a point was logged more than once
+        recs = {rec['idx']: rec for rec in self.records()}
+
+        dirname = os.path.dirname(self.fname)
+        fname = os.path.join(dirname, 'imp.pkl')
+
+        result, points = [], []
+        for idx in sorted(recs.keys()):
+            res = recs[idx]['result']
+
+            for jdx in range(int(recs[idx]['weight'])):
+                points.append((res[0], options, idx, fname, dirname, res[4]))
+                result.append(res)
+
+        joblib.dump(result, expls_file)
+        if points_file:
+            joblib.dump(points, points_file)
+
+        if info_file:
+            with open(info_file, 'w') as fp:
+                json.dump({str(idx): recs[idx].get('info', {}) for idx in sorted(recs.keys())},
+                        fp, indent=1, sort_keys=True)
+
+        return result
+
+
+#
+#==============================================================================
+if __name__ == '__main__':
+    # compacting the log(s) given on the command line,
+    # e.g. the log of a job that was killed
+    for logfile in sys.argv[1:]:
+        assert logfile.endswith('_expls.log'), 'Expected an *_expls.log file'
+
+        prefix = logfile[:-len('_expls.log')]
+        res = ExplanationLog(logfile).compact(prefix + '_expls.pkl',
+                prefix + '_points.pkl', info_file=prefix + '_info.json')
+
+        print('c {0}: {1} explanations'.format(prefix + '_expls.pkl', len(res)))
@@ -66,6 +66,7 @@ class Options(object):
         self.maxdepth = 3
         self.testsplit = 0.2
         self.seed = 7
+        self.threads = 0
 
         # maxsat options
         self.minz = False
@@ -76,9 +77,15 @@ class Options(object):
         # other options
         self.files = None
         self.cardenc = 'seqc'
+        self.check_predict = False
+        self.coredb = None
+        self.jobs = 1
         self.output = 'temp'
+        self.persist = False
         self.mapfile = None
+        self.race = False
         self.reduce = 'none'
+        self.resume = False
         self.separator = ','
         self.smallest = False
         self.solver = 'z3'
@@ -86,9 +93,20 @@ class Options(object):
         self.use_cld = False
         self.use_mhs = False
         self.verb = 0
+        self.warm = 0
+        self.xcache = None
+        self.xjobs = 1
         self.xnum = 1
+        self.xrebuild = 100
+        self.xstable = 0
+        self.xstate = None
         self.xtype = 'abd'
 
+        # per-instance budgets (0 means no limit)
+        self.xcalls = 0
+        self.xconflicts = 0
+        self.xtime = 0
+
         if command:
             self.parse(command)
 
@@ -102,16 +120,17 @@ class Options(object):
         try:
             opts, args = getopt.getopt(command[1:],
                                     '1a:C:ce:Ed:hHL:lm:Mn:N:o:pr:R:qs:tT:uvVwx:X:z',
-                                    ['am1', 'attack=', 'encode=', 'cardenc=',
-                                     'exhaust', 'help', 'map-file=',
+                                    ['am1', 'attack=', 'encode=', 'cardenc=', 'check-predict', 'coredb=',
+                                     'exhaust', 'help', 'jobs=', 'map-file=',
                                      'use-anchor=', 'lime-feats=', 'use-lime=',
                                      'use-shap=', 'use-categorical=',
                                      'preprocess-categorical=', 'pfiles=',
                                      'maxdepth=', 'minimum', 'nbestims=',
-                                     'output=', 'reduce=', 'rounds=', 'relax=',
+                                     'output=', 'persist', 'race', 'reduce=', 'resume', 'rounds=', 'relax=',
                                      'seed=', 'sep=', 'solver=', 'testsplit=',
-                                     'train', 'trim=', 'unit-mcs', 'use-cld',
-                                     'use-mhs', 'validate', 'verbose', 'xnum=',
+                                     'threads=', 'train', 'trim=', 'unit-mcs', 'use-cld',
+                                     'use-mhs', 'validate', 'verbose', 'warm=', 'xcache=', 'xcalls=',
+                                     'xconflicts=', 'xjobs=', 'xnum=', 'xrebuild=', 'xstable=', 'xstate=', 'xtime=',
                                      'xtype=', 'explain=', 'minz'])
         except getopt.GetoptError as err:
             sys.stderr.write(str(err).capitalize())
@@ -127,6 +146,10 @@ class Options(object):
                 self.use_categorical = True
             elif opt in ('-C', '--cardenc'):
                 self.cardenc = str(arg)
+            elif opt == '--check-predict':
+                self.check_predict = True
+            elif opt == '--coredb':
+                self.coredb = str(arg)
             elif opt in ('-d', '--maxdepth'):
                 self.maxdepth = int(arg)
             elif opt in ('-D', '--use-cld'):
@@ -140,6 +163,8 @@ class Options(object):
                 sys.exit(0)
             elif opt in ('-H', '--use-mhs'):
                 self.usemhs = True
+            elif opt == '--jobs':
+                self.jobs = int(arg)
             elif opt in ('-l', '--use-lime'):
                 self.uselime = True
             elif opt in ('-L', '--lime-feats'):
@@ -161,12 +186,18 @@ class Options(object):
                 self.preprocess_categorical_files = str(arg) #train_file, test_file(or empty, resulting file
             elif opt in ('-q', '--use-anchor'):
                 self.useanchor = True
+            elif opt == '--persist':
+                self.persist = True
+            elif opt == '--race':
+                self.race = True
             elif opt in ('-r', '--rounds'):
                 self.num_boost_round = int(arg)
             elif opt in ('-R', '--reduce'):
                 self.reduce = str(arg)
             elif opt == '--relax':
                 self.relax = int(arg)
+            elif opt == '--resume':
+                self.resume = True
             elif opt == '--seed':
                 self.seed = int(arg)
             elif opt == '--sep':
@@ -175,6 +206,8 @@ class Options(object):
                 self.solver = str(arg)
             elif opt == '--testsplit':
                 self.testsplit = float(arg)
+            elif opt == '--threads':
+                self.threads = int(arg)
             elif opt in ('-t', '--train'):
                 self.train = True
             elif opt in ('-T', '--trim'):
@@ -187,8 +220,26 @@ class Options(object):
                 self.verb += 1
             elif opt in ('-w', '--use-shap'):
                 self.useshap = True
+            elif opt == '--warm':
+                self.warm = int(arg)
             elif opt in ('-x', '--explain'):
                 self.explain = str(arg)
+            elif opt == '--xcache':
+                self.xcache = str(arg)
+            elif opt == '--xcalls':
+                self.xcalls = int(arg)
+            elif opt == '--xconflicts':
+                self.xconflicts = int(arg)
+            elif opt == '--xjobs':
+                self.xjobs = int(arg)
+            elif opt == '--xrebuild':
+                self.xrebuild = int(arg)
+            elif opt == '--xstable':
+                self.xstable = int(arg)
+            elif opt == '--xstate':
+                self.xstate = str(arg)
+            elif opt == '--xtime':
+                self.xtime = float(arg)
             elif opt in ('-X', '--xtype'):
                 self.xtype = str(arg)
             elif opt in ('-z', '--minz'):
@@ -198,7 +249,7 @@ class Options(object):
 
         if self.encode == 'none':
             self.encode = None
-        elif self.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa') and self.solver in ('cvc4', 'mathsat', 'yices', 'z3'):
+        elif self.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa') and self.solver in ('cvc4', 'mathsat', 'yices', 'z3', 'z3native'):
             # setting the default solver for the mxreasoning-based oracle
             self.solver = 'm22'
 
@@ -220,6 +271,10 @@ class Options(object):
         print('        -c, --use-categorical      Treat categorical features as categorical (with categorical features info if available)')
         print('        -C, --cardenc=<string>     Cardinality encoding to use')
         print('                                   Available values: cardn, kmtot, mtot, sortn, seqc, tot (default = seqc)')
+        print('        --check-predict            Check the predictions made by the MaxSAT explainer by evaluating the trees')
+        print('                                   against SAT propagation (for debugging)')
+        print('        --coredb=<string>          Directory keeping the unit cores found by the MaxSAT oracles for every instance,')
+        print('                                   reused by later runs explaining the same instances (with mx)')
         print('        -d, --maxdepth=<int>       Maximal depth of a tree')
         print('                                   Available values: [1, INT_MAX] (default = 3)')
         print('        -D, --use-cld              Use CLD calls when enumerating contrastive explanations directly')
@@ -228,6 +283,8 @@ class Options(object):
         print('        -E, --exhaust              Apply core exhaustion when running RC2')
         print('        -h, --help                 Show this message')
         print('        -H, --use-mhs              Use IHS procedure even for subset-minimal contrastive explanations')
+        print('        --jobs=<int>               Number of worker processes explaining test points in parallel')
+        print('                                   Available values: [1, INT_MAX] (default = 1)')
         print('        -l, --use-lime             Use LIME to compute an explanation')
         print('        -L, --lime-feats           Instruct LIME to compute an explanation of this size')
         print('                                   Available values: [1, INT_MAX], all (default = 5)')
@@ -239,22 +296,32 @@ class Options(object):
         print('                                   Available values: [1, INT_MAX], all (default = 1)')
         print('        -o, --output=<string>      Directory where output files will be stored (default: \'temp\')')
         print('        -p,                        Preprocess categorical data')
+        print('        --persist                  Keep one alien MaxSAT solver process per class alive, writing the feature values')
+        print('                                   of every call to its standard input as a line \'a <literals> 0\' (with mxa); the')
+        print('                                   solver must speak this protocol, e.g. -s \'scripts/alien_maxsat.py -i\'')
         print('        --pfiles                   Filenames to use when preprocessing')
         print('        -q, --use-anchor           Use Anchor to compute an explanation')
+        print('        --race                     Call the MaxSAT oracles of the classes of a multiclass model in parallel')
+        print('                                   processes, stopping at the first counterexample (with mx)')
         print('        -r, --rounds=<int>         Number of training rounds')
         print('                                   Available values: [1, INT_MAX] (default = 10)')
-        print('        -R, --reduce=<string>      Extract an MUS from each unsatisfiable core')
+        print('        -R, --reduce=<string>      Extract an MUS from each unsatisfiable core (an MCS from each')
+        print('                                   counterexample when enumerating abductive explanations with SMT)')
         print('                                   Available values: lin, none, qxp (default = none)')
         print('        --relax=<int>              Relax the model by reducing number of weight decimal points')
         print('                                   Available values: [0, INT_MAX] (default = 0)')
+        print('        --resume                   Skip test points already present in the explanation log')
         print('        --seed=<int>               Seed for random splitting')
         print('                                   Available values: [1, INT_MAX] (default = 7)')
         print('        --sep=<string>             Field separator used in input file (default = \',\')')
         print('        -s, --solver=<string>      An SMT reasoner to use')
-        print('                                   Available values (smt): cvc4, mathsat, yices, z3 (default = z3)')
+        print('                                   Available values (smt): cvc4, mathsat, yices, z3, z3native (default = z3)')
         print('                                   Available values (sat): g3, g4, m22, mgh, all-others-from-pysat (default = m22)')
+        print('        --threads=<int>            Number of threads used by XGBoost when training a model')
+        print('                                   Available values: [0, INT_MAX] (default = 0, i.e. XGBoost\'s default)')
         print('        -t, --train                Train a model of a given dataset')
         print('        -T, --trim=<int>           Trim unsatisfiable cores at most this number of times when running RC2')
+        print('                                   (or when enumerating explanations with SMT and Z3)')
         print('                                   Available values: [0, INT_MAX] (default = 0)')
         print('        --testsplit=<float>        Training and test sets split')
         print('                                   Available values: [0.0, 1.0] (default = 0.2)')
@@ -262,7 +329,28 @@ class Options(object):
         print('        -v, --verbose              Increase verbosity level')
         print('        -V, --validate             Validate explanation (show that it is too optimistic)')
         print('        -w, --use-shap             Use SHAP to compute an explanation')
+        print('        --warm=<int>               Seed the abductive enumeration (with SMT) of an instance with this number')
+        print('                                   of the latest MCSes of the instances explained before, once checked')
+        print('                                   Available values: [0, INT_MAX] (default = 0)')
         print('        -x, --explain=<string>     Explain a decision for a given comma-separated sample (default: none)')
+        print('        --xcache=<string>          Directory caching the explanations of instances by interval signature,')
+        print('                                   with the smtbool and MaxSAT encodings (default: none)')
+        print('        --xcalls=<int>             Limit on the number of oracle calls per instance')
+        print('                                   Available values: [0, INT_MAX] (default = 0, i.e. no limit)')
+        print('        --xconflicts=<int>         Limit on the number of solver conflicts per instance (Z3 only)')
+        print('                                   Available values: [0, INT_MAX] (default = 0, i.e. no limit)')
+        print('        --xjobs=<int>              Number of processes enumerating the abductive explanations of an instance')
+        print('                                   (with SMT) in parallel; ignored by the processes of --jobs (default = 1)')
+        print('        --xrebuild=<int>           Rebuild the SMT oracle after explaining this number of samples')
+        print('                                   Available values: [0, INT_MAX] (default = 100, 0 means never)')
+        print('        --xstable=<int>            Stop enumerating the explanations (with SMT) of an instance once the feature')
+        print('                                   rankings of the responsibility, Holler-Packel and Deegan-Packel indices')
+        print('                                   have not changed for this number of explanations')
+        print('                                   Available values: [0, INT_MAX] (default = 0, i.e. never)')
+        print('        --xstate=<string>          Directory keeping the MCSes and AXps found for every instance, so that')
+        print('                                   abductive enumeration (with SMT or MaxSAT) can be resumed with a larger --xnum')
+        print('        --xtime=<float>            Limit on the wall time (in seconds) spent on an instance')
+        print('                                   Available values: [0, FLOAT_MAX] (default = 0, i.e. no limit)')
         print('        -X, --xtype=<string>       Type of explanation to compute: abductive or contrastive')
         print('                                   Available values: abd, con (default = abd)')
         print('        -z, --minz                 Apply heuristic core minimization when running RC2')
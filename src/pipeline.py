@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## pipeline.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from __future__ import print_function
+import getopt
+import hashlib
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+
+
+#
+#==============================================================================
+# datasets of the experiments and the number of trees of their models
+datasets = [('compas_ood', 100), ('compas_ood1', 100), ('compas_shapood', 100),
+        ('compas_shapood1', 100), ('german_lmodified', 50), ('german_smodified', 50)]
+
+# depth of the trees and test split of all the models
+maxdepth, testsplit = 3, 0.2
+
+# number of trees xreason_agg.py names the directory of the explanations
+# after; it does not affect the models loaded from a file
+xnbestim = 100
+
+# command-line options of xreason_agg.py for every kind of explanations
+explainers = {
+    'mwc': ['-e', 'smt', '-s', 'z3', '--xnum', '200'],
+    'lime': ['-l', '-L', '100', '--xnum', '100'],
+    'shap': ['-w', '-L', '100', '--xnum', '100']
+}
+
+
+#
+#==============================================================================
+class Stage(object):
+    """
+        A command together with the files it reads and writes.
+    """
+
+    def __init__(self, name, command, inputs, outputs, deps=[], stdout=None):
+        """
+            Constructor.
+        """
+
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = outputs
+        self.deps = deps
+        self.stdout = stdout
+
+        self.proc = None
+        self.status = 'waiting'
+        self.time = 0.0
+
+
+#
+#==============================================================================
+class Pipeline(object):
+    """
+        Dependency graph of the experiments: datasets and seeds, then
+        trained models, then explanations, then the aggregated tables.
+        A stage is rerun only if the hash of its command and input files
+        differs from the one recorded in the state file after its last
+        successful run (or if one of its outputs is missing).
+    """
+
+    def __init__(self, state_file, jobs=1, force=False, dry=False):
+        """
+            Constructor.
+        """
+
+        self.stages = {}
+        self.order = []
+
+        self.state_file = state_file
+        self.jobs = jobs
+        self.force = force
+        self.dry = dry
+
+        self.state = {}
+        if os.path.exists(self.state_file):
+            with open(self.state_file, 'r') as fp:
+                self.state = json.load(fp)
+
+        # file hashes computed so far, keyed by (path, size, mtime)
+        self.hashes = {}
+
+    def add(self, stage):
+        """
+            Add a stage to the graph.
+        """
+
+        self.stages[stage.name] = stage
+        self.order.append(stage.name)
+
+    def file_hash(self, fname):
+        """
+            Hash of the contents of a file.
+        """
+
+        st = os.stat(fname)
+        key = (fname, st.st_size, st.st_mtime)
+
+        if key not in self.hashes:
+            h = hashlib.sha1()
+            with open(fname, 'rb') as fp:
+                for chunk in iter(lambda: fp.read(1 << 20), b''):
+                    h.update(chunk)
+
+            self.hashes[key] = h.hexdigest()
+
+        return self.hashes[key]
+
+    def digest(self, stage):
+        """
+            Hash of the command and the inputs of a stage.
+        """
+
+        h = hashlib.sha1(' '.join(stage.command).encode('utf-8'))
+        for fname in sorted(stage.inputs):
+            h.update(fname.encode('utf-8'))
+            h.update(self.file_hash(fname).encode('utf-8') if os.path.exists(fname) else b'-')
+
+        return h.hexdigest()
+
+    def uptodate(self, stage):
+        """
+            Check if a stage can be skipped.
+        """
+
+        if self.force or not all([os.path.exists(f) for f in stage.outputs]):
+            return False
+
+        # in a dry run, the outputs of the dependencies are not renewed
+        if self.dry and 'done' in [self.stages[d].status for d in stage.deps]:
+            return False
+
+        return self.state.get(stage.name) == self.digest(stage)
+
+    def save_state(self):
+        """
+            Record the digests of the stages run so far.
+        """
+
+        tmp = self.state_file + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump(self.state, fp, indent=1, sort_keys=True)
+
+        os.rename(tmp, self.state_file)
+
+    def start(self, stage):
+        """
+            Launch a stage, or skip it if it is up to date.
+        """
+
+        # the inputs are final once all the dependencies are done
+        if self.uptodate(stage):
+            stage.status = 'skipped'
+            return
+
+        print('c running {0}: {1}'.format(stage.name, ' '.join(stage.command)))
+
+        if self.dry:
+            stage.status = 'done'
+            return
+
+        for fname in stage.outputs + ([stage.stdout] if stage.stdout else []):
+            if os.path.dirname(fname) and not os.path.exists(os.path.dirname(fname)):
+                os.makedirs(os.path.dirname(fname))
+
+        out = open(stage.stdout, 'w') if stage.stdout else open(os.devnull, 'w')
+        stage.proc = subprocess.Popen(stage.command, stdout=out,
+                stderr=subprocess.STDOUT)
+        out.close()
+
+        stage.status = 'running'
+        stage.time = time.time()
+
+    def finish(self, stage):
+        """
+            Collect a finished stage.
+        """
+
+        stage.time = time.time() - stage.time
+
+        if stage.proc.returncode == 0 and all([os.path.exists(f) for f in stage.outputs]):
+            stage.status = 'done'
+            self.state[stage.name] = self.digest(stage)
+            self.save_state()
+        else:
+            stage.status = 'failed'
+
+    def run(self):
+        """
+            Run the stages, as many at a time as allowed, each of them
+            once all its dependencies are finished.
+        """
+
+        running = []
+
+        while True:
+            for name in self.order:
+                stage = self.stages[name]
+
+                if stage.status != 'waiting':
+                    continue
+
+                states = [self.stages[d].status for d in stage.deps]
+                if 'failed' in states or 'cancelled' in states:
+                    stage.status = 'cancelled'
+                elif all([s in ('done', 'skipped') for s in states]) and len(running) < self.jobs:
+                    self.start(stage)
+                    if stage.status == 'running':
+                        running.append(stage)
+
+            if not running:
+                if all([s.status != 'waiting' for s in self.stages.values()]):
+                    break
+                continue
+
+            time.sleep(0.1)
+
+            for stage in running[:]:
+                if stage.proc.poll() is not None:
+                    running.remove(stage)
+                    self.finish(stage)
+
+        self.report()
+
+        return all([s.status in ('done', 'skipped') for s in self.stages.values()])
+
+    def report(self):
+        """
+            Print the status and running time of every stage.
+        """
+
+        print('c')
+        for name in self.order:
+            stage = self.stages[name]
+            print('c {0:<60} {1:>9} {2:>10.2f}s'.format(name, stage.status, stage.time))
+
+        print('c total time: {0:.2f}s'.format(sum([s.time for s in self.stages.values()])))
+
+
+#
+#==============================================================================
+def basename(fname, nof_trees):
+    """
+        Name XGBooster gives to the files it creates for the given file
+        (see XGBooster.basename), without their directory.
+    """
+
+    return '{0}_nbestim_{1}_maxdepth_{2}_testsplit_{3}'.format(
+            os.path.splitext(os.path.basename(fname))[0], nof_trees,
+            maxdepth, testsplit)
+
+
+#
+#==============================================================================
+def build(pipeline, names, seeds, kinds):
+    """
+        Add the stages of the given datasets, seeds and explainers.
+    """
+
+    python = sys.executable
+    expls = []
+
+    # models trained side by side share the cores
+    threads = max(1, multiprocessing.cpu_count() // pipeline.jobs)
+
+    for dataset, nof_trees in datasets:
+        if names and dataset not in names:
+            continue
+
+        for seed in seeds:
+            bench = '{0}_{1}'.format(dataset, seed)
+
+            modfile = 'temp/{0}/{1}.mod.pkl'.format(bench, basename(bench + '.csv', nof_trees))
+            train = 'train/' + bench
+
+            pipeline.add(Stage(train,
+                [python, 'src/xreason.py', '-t', '-n', str(nof_trees), '-d',
+                    str(maxdepth), '--testsplit', str(testsplit), '--threads',
+                    str(threads), 'datasets/{0}/{0}.csv'.format(bench)],
+                inputs=['datasets/{0}/{0}.csv'.format(bench)],
+                outputs=[modfile, modfile + '.splitdata.pkl'],
+                stdout='temp/{0}/train.log'.format(bench)))
+
+            # the directory xreason_agg.py stores the explanations into,
+            # named after the options it is given (not those of the model)
+            dirname = 'data/' + basename(modfile, xnbestim)
+
+            for kind in kinds:
+                pipeline.add(Stage('{0}/{1}'.format(kind, bench),
+                    [python, 'src/xreason_agg.py'] + explainers[kind] + ['-n',
+                        str(xnbestim), '-d', str(maxdepth), '--testsplit',
+                        str(testsplit), '-a',
+                        'datasets/{0}/config_num.yml'.format(dataset), modfile,
+                        'datasets/{0}/{0}_test.csv'.format(bench)],
+                    inputs=[modfile, modfile + '.splitdata.pkl',
+                        'datasets/{0}/config_num.yml'.format(dataset),
+                        'datasets/{0}/{0}_test.csv'.format(bench)],
+                    outputs=['{0}/{1}_expls.pkl'.format(dirname, kind)],
+                    deps=[train],
+                    stdout='{0}/{1}.log'.format(dirname, kind)))
+
+                expls.append('{0}/{1}'.format(kind, bench))
+
+    # the tables are computed out of all the explanations in data/
+    pipeline.add(Stage('aggregate', [python, 'scripts/compute_attack_results.py'],
+        inputs=sum([pipeline.stages[e].outputs for e in expls], []),
+        outputs=['results/attack_results.txt'], deps=expls,
+        stdout='results/attack_results.txt'))
+
+
+#
+#==============================================================================
+def usage():
+    """
+        Print usage message.
+    """
+
+    print('Usage:', os.path.basename(sys.argv[0]), '[options]')
+    print('Options:')
+    print('        -d, --datasets=<string>    Comma-separated datasets to consider')
+    print('                                   Default: all of them')
+    print('        -e, --explainers=<string>  Comma-separated kinds of explanations')
+    print('                                   Available values: lime, mwc, shap (default = mwc,lime,shap)')
+    print('        -f, --force                Rerun the stages even if their inputs did not change')
+    print('        -h, --help                 Show this message')
+    print('        -j, --jobs=<int>           Number of stages to run in parallel')
+    print('                                   Available values: [1 .. INT_MAX] (default = 1)')
+    print('        -n, --dry-run              Only show the stages that would be run')
+    print('        -s, --seeds=<string>       Comma-separated indices of the dataset variants')
+    print('                                   Default: 0,1,2,3,4,5,6,7,8,9')
+    print('        --state=<string>           State file (default = temp/pipeline.json)')
+
+
+#
+#==============================================================================
+if __name__ == '__main__':
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'd:e:fhj:ns:',
+                ['datasets=', 'explainers=', 'force', 'help', 'jobs=',
+                    'dry-run', 'seeds=', 'state='])
+    except getopt.GetoptError as err:
+        sys.stderr.write(str(err).capitalize() + '\n')
+        usage()
+        sys.exit(1)
+
+    names, seeds, kinds = None, list(range(10)), ['mwc', 'lime', 'shap']
+    jobs, force, dry, state = 1, False, False, 'temp/pipeline.json'
+
+    for opt, arg in opts:
+        if opt in ('-d', '--datasets'):
+            names = arg.split(',')
+        elif opt in ('-e', '--explainers'):
+            kinds = arg.split(',')
+        elif opt in ('-f', '--force'):
+            force = True
+        elif opt in ('-h', '--help'):
+            usage()
+            sys.exit(0)
+        elif opt in ('-j', '--jobs'):
+            jobs = int(arg)
+        elif opt in ('-n', '--dry-run'):
+            dry = True
+        elif opt in ('-s', '--seeds'):
+            seeds = [int(s) for s in arg.split(',')]
+        elif opt == '--state':
+            state = arg
+
+    if os.path.dirname(state) and not os.path.exists(os.path.dirname(state)):
+        os.makedirs(os.path.dirname(state))
+
+    pipeline = Pipeline(state, jobs=jobs, force=force, dry=dry)
+    build(pipeline, names, seeds, kinds)
+
+    sys.exit(0 if pipeline.run() else 1)
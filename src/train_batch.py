@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## train_batch.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from __future__ import print_function
+from aggrxp.src.data import Data
+import getopt
+import multiprocessing
+import os
+from options import Options
+import sys
+import time
+from xgbooster import XGBooster
+
+
+#
+#==============================================================================
+def train(args):
+    """
+        Train one model. Runs in a worker process.
+    """
+
+    fname, nof_trees, threads, output = args
+
+    options = Options(['xreason.py', '-t', '-n', str(nof_trees), '-o', output,
+        '--threads', str(threads), fname])
+
+    start = time.time()
+
+    try:
+        data = Data(filename=fname, mapfile=options.mapfile,
+                separator=options.separator,
+                use_categorical=options.use_categorical)
+
+        xgb = XGBooster(options, from_data=data)
+        train_accuracy, test_accuracy, model = xgb.train()
+    except Exception as e:
+        return fname, nof_trees, None, str(e), time.time() - start
+
+    return fname, nof_trees, xgb.modfile, (train_accuracy, test_accuracy), \
+            time.time() - start
+
+
+#
+#==============================================================================
+def usage():
+    """
+        Print usage message.
+    """
+
+    print('Usage:', os.path.basename(sys.argv[0]), '[options] dataset-name|csv-file ...')
+    print('Options:')
+    print('        -h, --help                 Show this message')
+    print('        -j, --jobs=<int>           Number of models trained in parallel')
+    print('                                   Available values: [1, INT_MAX] (default = number of cores)')
+    print('        -n, --nbestims=<string>    Comma-separated numbers of trees per class')
+    print('                                   Available values: [1, INT_MAX] (default = 100)')
+    print('        -o, --output=<string>      Directory where output files will be stored (default: \'temp\')')
+    print('        -s, --seeds=<string>       Comma-separated indices of the dataset variants, i.e.')
+    print('                                   datasets/<name>_<seed>/<name>_<seed>.csv (default: none,')
+    print('                                   i.e. datasets/<name>/<name>.csv)')
+    print('        --threads=<int>            Number of XGBoost threads per model')
+    print('                                   Available values: [1, INT_MAX] (default = cores / jobs)')
+
+
+#
+#==============================================================================
+if __name__ == '__main__':
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'hj:n:o:s:',
+                ['help', 'jobs=', 'nbestims=', 'output=', 'seeds=', 'threads='])
+    except getopt.GetoptError as err:
+        sys.stderr.write(str(err).capitalize() + '\n')
+        usage()
+        sys.exit(1)
+
+    jobs, threads = multiprocessing.cpu_count(), 0
+    nbestims, seeds, output = [100], [], 'temp'
+
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit(0)
+        elif opt in ('-j', '--jobs'):
+            jobs = int(arg)
+        elif opt in ('-n', '--nbestims'):
+            nbestims = [int(n) for n in arg.split(',')]
+        elif opt in ('-o', '--output'):
+            output = str(arg)
+        elif opt in ('-s', '--seeds'):
+            seeds = [s for s in arg.split(',')]
+        elif opt == '--threads':
+            threads = int(arg)
+
+    if not args:
+        usage()
+        sys.exit(1)
+
+    # the cores are split evenly between the models trained at a time
+    if not threads:
+        threads = max(1, multiprocessing.cpu_count() // jobs)
+
+    files = []
+    for name in args:
+        if name.endswith('.csv'):
+            files.append(name)
+        elif seeds:
+            files.extend(['datasets/{0}_{1}/{0}_{1}.csv'.format(name, s) for s in seeds])
+        else:
+            files.append('datasets/{0}/{0}.csv'.format(name))
+
+    tasks = []
+    for fname in files:
+        # output directories are created here rather than by
+        # the workers, which would race for the shared ones
+        bench_dir = os.path.join(output, os.path.splitext(os.path.basename(fname))[0])
+        if not os.path.exists(bench_dir):
+            os.makedirs(bench_dir)
+
+        for nof_trees in nbestims:
+            tasks.append((fname, nof_trees, threads, output))
+
+    # the largest models go first so that
+    # the pool does not end with a long straggler
+    tasks.sort(key=lambda t: -os.path.getsize(t[0]) * t[1] if os.path.exists(t[0]) else 0)
+
+    print('c training {0} models, {1} at a time, {2} thread(s) each'.format(len(tasks), jobs, threads))
+
+    start, failed = time.time(), 0
+
+    # every worker trains a single model, so that its memory is given back
+    pool = multiprocessing.Pool(processes=jobs, maxtasksperchild=1)
+    for fname, nof_trees, modfile, res, tm in pool.imap_unordered(train, tasks):
+        if modfile:
+            print('c {0}: train acc {1}, test acc {2}, {3:.2f}s'.format(modfile, res[0], res[1], tm))
+        else:
+            print('c {0} (n={1}) failed: {2}'.format(fname, nof_trees, res))
+            failed += 1
+
+    pool.close()
+    pool.join()
+
+    print('c total time: {0:.2f}s'.format(time.time() - start))
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,531 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## workqueue.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from __future__ import print_function
+from aggrxp.src.data import Data
+from explog import ExplanationLog
+import errno
+import getopt
+import hashlib
+import numpy as np
+import os
+import pickle
+import random
+import socket
+import sys
+import threading
+import time
+
+
+#
+#==============================================================================
+class WorkQueue(object):
+    """
+        A queue of explanation tasks kept in a shared directory. A job is
+        one run of xreason_agg.py (i.e. a model and a test set) and a task
+        is one distinct point of the job's test set. The directory has
+        four parts:
+
+            jobs/<job>.pkl        the command line of the job
+            todo/<job>.<idx>      tasks that are not finished yet
+            leases/<job>.<idx>    tasks being explained right now
+            done/<job>.<idx>      results of the finished tasks
+
+        A task is claimed by creating its lease file exclusively, so no
+        locking is needed. The worker holding a lease keeps touching it;
+        a lease that has not been touched for ttl seconds belongs to a
+        dead worker and can be taken over by anyone.
+    """
+
+    def __init__(self, qdir, ttl=600):
+        """
+            Constructor.
+        """
+
+        self.qdir = os.path.abspath(qdir)
+        self.ttl = ttl
+
+        for sub in ('jobs', 'todo', 'leases', 'done'):
+            path = os.path.join(self.qdir, sub)
+            if not os.path.exists(path):
+                try:
+                    os.makedirs(path)
+                except OSError as e:
+                    if e.errno != errno.EEXIST:
+                        raise
+
+        self.jobs = {}
+
+    def path(self, sub, name):
+        """
+            Path of an entry of the queue.
+        """
+
+        return os.path.join(self.qdir, sub, name)
+
+    def add_job(self, argv, cwd, dirname, type, weights):
+        """
+            Add a job with one task per distinct point. Tasks that
+            are already done are not queued again.
+        """
+
+        jobid = hashlib.sha1(pickle.dumps((cwd, argv), protocol=2)).hexdigest()[:12]
+
+        job = {'id': jobid, 'argv': argv, 'cwd': cwd, 'dirname': dirname,
+                'type': type, 'weights': weights}
+
+        self.atomic_dump(job, self.path('jobs', jobid + '.pkl'))
+
+        nof_tasks = 0
+        for idx in range(len(weights)):
+            task = '{0}.{1}'.format(jobid, idx)
+
+            if not os.path.exists(self.path('done', task)):
+                open(self.path('todo', task), 'a').close()
+                nof_tasks += 1
+
+        return jobid, nof_tasks
+
+    def job(self, jobid):
+        """
+            Description of a job.
+        """
+
+        if jobid not in self.jobs:
+            with open(self.path('jobs', jobid + '.pkl'), 'rb') as fp:
+                self.jobs[jobid] = pickle.load(fp)
+
+        return self.jobs[jobid]
+
+    def all_jobs(self):
+        """
+            Identifiers of all the jobs of the queue.
+        """
+
+        return sorted([f[:-4] for f in os.listdir(os.path.join(self.qdir, 'jobs'))
+            if f.endswith('.pkl')])
+
+    def pending(self):
+        """
+            Tasks that are not finished yet.
+        """
+
+        return os.listdir(os.path.join(self.qdir, 'todo'))
+
+    def claim(self, worker, prefer=None):
+        """
+            Claim a task, preferably of the given job (to reuse the model
+            the worker has loaded). Returns None if every pending task is
+            held by a live worker.
+        """
+
+        tasks = self.pending()
+        random.shuffle(tasks)
+
+        if prefer:
+            tasks.sort(key=lambda t: not t.startswith(prefer + '.'))
+
+        for task in tasks:
+            if os.path.exists(self.path('done', task)):
+                self.remove(self.path('todo', task))
+                continue
+
+            lease = self.path('leases', task)
+
+            if not self.lock(lease, worker):
+                if not self.expire(lease, worker) or not self.lock(lease, worker):
+                    continue
+
+            # the task may have been finished in the meantime
+            if os.path.exists(self.path('done', task)):
+                self.remove(lease)
+                self.remove(self.path('todo', task))
+                continue
+
+            return task
+
+        return None
+
+    def lock(self, lease, worker):
+        """
+            Create a lease file. Fails if the file exists.
+        """
+
+        try:
+            fd = os.open(lease, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                return False
+            raise
+
+        os.write(fd, worker.encode('utf-8'))
+        os.close(fd)
+
+        return True
+
+    def stale(self, fname):
+        """
+            Check if a lease file has not been touched for too long.
+        """
+
+        try:
+            return time.time() - os.path.getmtime(fname) > self.ttl
+        except OSError:
+            return False
+
+    def expire(self, lease, worker):
+        """
+            Remove a lease of a dead worker. The lease is first renamed,
+            which only one of the competing workers can do. If the lease
+            turns out to be alive after all, it is put back.
+        """
+
+        if not self.stale(lease):
+            return False
+
+        grave = '{0}.{1}'.format(lease, worker)
+        try:
+            os.rename(lease, grave)
+        except OSError:
+            return False
+
+        if not self.stale(grave):
+            # someone else has just expired and re-claimed it
+            try:
+                os.link(grave, lease)
+            except OSError:
+                pass
+            self.remove(grave)
+            return False
+
+        self.remove(grave)
+        return True
+
+    def touch(self, task):
+        """
+            Heartbeat of a lease.
+        """
+
+        try:
+            os.utime(self.path('leases', task), None)
+        except OSError:
+            pass
+
+    def finish(self, task, record):
+        """
+            Store the result of a task and release it. Storing is atomic, so
+            if a task was explained twice (by a worker that was wrongly
+            considered dead) the result is simply written twice.
+        """
+
+        self.atomic_dump(record, self.path('done', task))
+        self.remove(self.path('leases', task))
+        self.remove(self.path('todo', task))
+
+    def results(self, jobid):
+        """
+            Finished tasks of a job.
+        """
+
+        recs = []
+        for task in os.listdir(os.path.join(self.qdir, 'done')):
+            if task.startswith(jobid + '.') and not task.endswith('.tmp'):
+                with open(self.path('done', task), 'rb') as fp:
+                    recs.append(pickle.load(fp))
+
+        return recs
+
+    def atomic_dump(self, obj, fname):
+        """
+            Write a pickle so that readers never see a partial file.
+        """
+
+        tmp = '{0}.{1}.{2}.tmp'.format(fname, socket.gethostname(), os.getpid())
+        with open(tmp, 'wb') as fp:
+            pickle.dump(obj, fp)
+
+        os.rename(tmp, fname)
+
+    def remove(self, fname):
+        """
+            Remove a file if it exists.
+        """
+
+        try:
+            os.remove(fname)
+        except OSError:
+            pass
+
+
+#
+#==============================================================================
+class Heartbeat(threading.Thread):
+    """
+        Background thread touching the lease of the current task.
+    """
+
+    def __init__(self, queue, task, period):
+        """
+            Constructor.
+        """
+
+        super(Heartbeat, self).__init__()
+        self.daemon = True
+
+        self.queue = queue
+        self.task = task
+        self.period = period
+        self.stopped = threading.Event()
+
+    def run(self):
+        """
+            Touch the lease until stopped.
+        """
+
+        while not self.stopped.wait(self.period):
+            self.queue.touch(self.task)
+
+    def stop(self):
+        """
+            Stop the thread.
+        """
+
+        self.stopped.set()
+        self.join()
+
+
+#
+#==============================================================================
+class JobRunner(object):
+    """
+        The model, test set and explanation session of a job.
+    """
+
+    def __init__(self, job):
+        """
+            Constructor.
+        """
+
+        from options import Options
+        from xgbooster import ExplainSession
+        from xreason_agg import get_categorical_features
+
+        # paths in the command line are relative to the directory
+        # where the job was added
+        os.chdir(job['cwd'])
+
+        self.options = Options(['xreason_agg.py'] + job['argv'])
+        self.weights = job['weights']
+
+        data = Data(filename=self.options.files[1], mapfile=self.options.mapfile,
+                separator=self.options.separator,
+                use_categorical=self.options.use_categorical)
+
+        # the same points as in XGBooster(options, from_data=data)
+        dataset = np.asarray(data.samps, dtype=np.float32)
+        self.X = dataset[:, 0:len(data.names) - 1]
+        self.Y = dataset[:, len(data.names) - 1]
+
+        self.options.limefeats = len(data.names) - 1
+
+        self.session = ExplainSession(self.options, self.options.files[0],
+                categorical_features=get_categorical_features(self.options.files[0]))
+
+    def run(self, idx):
+        """
+            Explain one point of the test set.
+        """
+
+        from xreason_agg import get_explainers
+
+        point = self.X[idx]
+        use_lime, use_anchor, use_shap = get_explainers(self.options)
+
+        expl, y_pred, time = self.session.explain(point, use_lime=use_lime,
+                use_anchor=use_anchor, use_shap=use_shap,
+                nof_feats=self.options.limefeats)
+
+        res = (point, idx, expl, y_pred, self.Y[idx], time)
+
+        return {'idx': idx, 'weight': self.weights[idx], 'result': res,
+                'info': self.session.info}
+
+
+#
+#==============================================================================
+def populate(queue, argv):
+    """
+        Add a job given by the command line of xreason_agg.py.
+    """
+
+    from options import Options
+    from xgbooster import XGBooster
+    from xreason_agg import get_categorical_features
+
+    options = Options(['xreason_agg.py'] + argv)
+    assert options.attack and len(options.files) >= 2, \
+            'Expected an attack configuration, a model and a test set'
+
+    data = Data(filename=options.files[1], mapfile=options.mapfile,
+            separator=options.separator,
+            use_categorical=options.use_categorical)
+
+    # the results go where xreason_agg.py would put them
+    xgb = XGBooster(options, from_model=options.files[0],
+            categorical_features=get_categorical_features(options.files[0]))
+
+    type = 'mwc'
+    if options.uselime:
+        type = 'lime'
+    if options.useshap:
+        type = 'shap'
+
+    cwd = os.getcwd()
+    dirname = os.path.join(cwd, 'data', xgb.basename.split('/')[-1])
+
+    jobid, nof_tasks = queue.add_job(argv, cwd, dirname, type, data.wghts)
+    print('c job {0}: {1} tasks queued ({2})'.format(jobid, nof_tasks, dirname))
+
+
+#
+#==============================================================================
+def work(queue):
+    """
+        Claim and explain tasks until there are none left.
+    """
+
+    worker = '{0}.{1}'.format(socket.gethostname(), os.getpid())
+    runner, jobid = None, None
+
+    while True:
+        task = queue.claim(worker, prefer=jobid)
+
+        if task is None:
+            if not queue.pending():
+                break
+
+            # the remaining tasks are held by other workers;
+            # waiting in case some of them die
+            time.sleep(min(queue.ttl / 4.0, 30))
+            continue
+
+        if task.split('.')[0] != jobid:
+            # one job is kept in memory at a time
+            jobid = task.split('.')[0]
+            runner = JobRunner(queue.job(jobid))
+
+        heart = Heartbeat(queue, task, queue.ttl / 4.0)
+        heart.start()
+
+        try:
+            record = runner.run(int(task.split('.')[1]))
+        finally:
+            heart.stop()
+
+        queue.finish(task, record)
+        print('c {0}: {1} done'.format(worker, task))
+
+
+#
+#==============================================================================
+def merge(queue):
+    """
+        Put the results of every job into its data/<name>/ directory.
+    """
+
+    from options import Options
+
+    for jobid in queue.all_jobs():
+        job = queue.job(jobid)
+
+        if not os.path.exists(job['dirname']):
+            os.makedirs(job['dirname'])
+
+        prefix = os.path.join(job['dirname'], job['type'])
+
+        # the results are added to the log of the directory, which is
+        # then compacted the same way as at the end of xreason_agg.py
+        log = ExplanationLog(prefix + '_expls.log')
+        done = log.done()
+        log.open(resume=True)
+
+        recs = queue.results(jobid)
+        for rec in sorted(recs, key=lambda r: r['idx']):
+            if rec['idx'] not in done:
+                log.append(rec['idx'], rec['weight'], rec['result'], rec['info'])
+
+        log.close()
+
+        cwd = os.getcwd()
+        os.chdir(job['cwd'])
+        options = Options(['xreason_agg.py'] + job['argv'])
+        os.chdir(cwd)
+
+        log.compact(prefix + '_expls.pkl', prefix + '_points.pkl', options,
+                prefix + '_info.json')
+
+        missing = len(job['weights']) - len(done | set([r['idx'] for r in recs]))
+        print('c job {0}: {1} points merged into {2}, {3} missing'.format(jobid,
+            len(job['weights']) - missing, prefix + '_expls.pkl', missing))
+
+
+#
+#==============================================================================
+def usage():
+    """
+        Print usage message.
+    """
+
+    print('Usage:', os.path.basename(sys.argv[0]), 'command [-t ttl] queue [xreason_agg options] [model test.csv]')
+    print('Commands:')
+    print('        populate                   Add a job for the given model and test set of xreason_agg.py')
+    print('        work                       Explain the queued points until there are none left')
+    print('        merge                      Store the results in data/<name>/ as xreason_agg.py does')
+    print('        status                     Show the number of queued, leased and finished points')
+    print('Options:')
+    print('        -h, --help                 Show this message')
+    print('        -t, --ttl=<float>          Seconds after which a lease of a silent worker expires')
+    print('                                   Available values: (0 .. INT_MAX] (default = 600)')
+
+
+#
+#==============================================================================
+if __name__ == '__main__':
+    try:
+        command = sys.argv[1]
+        opts, args = getopt.getopt(sys.argv[2:], 'ht:', ['help', 'ttl='])
+    except (IndexError, getopt.GetoptError) as err:
+        usage()
+        sys.exit(1)
+
+    ttl = 600
+    for opt, arg in opts:
+        if opt in ('-h', '--help'):
+            usage()
+            sys.exit(0)
+        elif opt in ('-t', '--ttl'):
+            ttl = float(arg)
+
+    if command not in ('populate', 'work', 'merge', 'status') or not args:
+        usage()
+        sys.exit(1)
+
+    queue = WorkQueue(args[0], ttl=ttl)
+
+    if command == 'populate':
+        populate(queue, args[1:])
+    elif command == 'work':
+        work(queue)
+    elif command == 'merge':
+        merge(queue)
+    else:
+        print('c queued: {0}, leased: {1}, done: {2}'.format(len(queue.pending()),
+            len([l for l in os.listdir(os.path.join(args[0], 'leases'))]),
+            len([d for d in os.listdir(os.path.join(args[0], 'done')) if not d.endswith('.tmp')])))
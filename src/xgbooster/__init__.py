@@ -1,4 +1,24 @@
-from .encode import *
-from .tree import *
-from .xgbooster import *
-from .preprocess import *
\ No newline at end of file
+import importlib
+
+# the submodules (and the heavy packages they depend on) are
+# imported when one of their names is accessed for the first time
+_names = {
+    'SMTEncoder': 'encode', 'MXEncoder': 'encode',
+    'xgnode': 'tree', 'build_tree': 'tree', 'walk_tree': 'tree',
+    'scores_tree': 'tree', 'TreeEnsemble': 'tree', 'get_xgboost_json': 'tree',
+    'XGBooster': 'xgbooster',
+    'preprocess_dataset': 'preprocess',
+    'ExplainSession': 'session',
+    'OnlineIndices': 'aggregate'
+}
+
+__all__ = sorted(_names.keys())
+
+
+def __getattr__(name):
+    if name in _names:
+        value = getattr(importlib.import_module('.' + _names[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError('module {0!r} has no attribute {1!r}'.format(__name__, name))
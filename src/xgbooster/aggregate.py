@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## aggregate.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+import numpy as np
+
+
+#
+#==============================================================================
+class OnlineIndices(object):
+    """
+        Responsibility, Holler-Packel and Deegan-Packel indices of the
+        features, updated with every new explanation instead of being
+        computed once all of them are known (as ExplanationAggregator of
+        scripts/utils.py does; the normalized scores are the same).
+    """
+
+    def __init__(self, nof_feats):
+        """
+            Constructor.
+        """
+
+        self.resp = np.zeros(nof_feats)
+        self.holler = np.zeros(nof_feats)
+        self.deegan = np.zeros(nof_feats)
+
+        # number of explanations seen so far
+        self.count = 0
+
+        # feature rankings and the number of
+        # explanations that did not change them
+        self.ranks = None
+        self.unchanged = 0
+
+    def update(self, expl):
+        """
+            Take an explanation (a set of feature ids) into account.
+        """
+
+        self.count += 1
+
+        for f in expl:
+            self.resp[f] = max(self.resp[f], 1.0 / len(expl))
+            self.holler[f] += 1.0
+            self.deegan[f] += 1.0 / len(expl)
+
+        ranks = self.rankings()
+        self.unchanged = self.unchanged + 1 if ranks == self.ranks else 0
+        self.ranks = ranks
+
+    def scores(self):
+        """
+            Normalized responsibility, Holler-Packel and Deegan-Packel
+            scores of the features.
+        """
+
+        return tuple([normalize(s) for s in (self.resp, self.holler, self.deegan)])
+
+    def rankings(self):
+        """
+            Features sorted by decreasing score, for each of the indices.
+        """
+
+        return tuple([tuple(np.argsort(-s, kind='stable')) for s in self.scores()])
+
+    def stable(self, k):
+        """
+            Check whether the rankings have not changed for the last k
+            explanations.
+        """
+
+        return self.unchanged >= k
+
+
+#
+#==============================================================================
+def normalize(scores):
+    """
+        Scores divided by their sum and rounded to two decimals.
+    """
+
+    if np.sum(scores) == 0:
+        return scores
+
+    return np.round(scores / np.sum(scores), 2)
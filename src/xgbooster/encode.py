@@ -13,8 +13,11 @@
 from __future__ import print_function
 import collections
 from decimal import Decimal
+import hashlib
+import json
 from .mxreason import MXReasoner, ClassEnc
 import numpy as np
+import os
 from pysat.card import *
 from pysat.formula import IDPool, CNF
 from pysmt.smtlib.parser import SmtLibParser
@@ -281,7 +284,8 @@ class SMTEncoder(object):
 
         # now, getting the model
         escores = []
-        model = get_model(And(self.enc, *hypos), solver_name=self.optns.solver)
+        model = get_model(And(self.enc, *hypos), solver_name='z3' if \
+                self.optns.solver == 'z3native' else self.optns.solver)
         for c in range(self.nofcl):
             v = Symbol('class{0}_score'.format(c), typename=REAL)
             escores.append(float(model.get_py_value(v)))
@@ -387,6 +391,9 @@ class MXEncoder(SMTEncoder):
         # variable to feature id
         self.vid2fid = {}
 
+        # leaf variable to the literals of its path
+        self.leafpaths = {}
+
         if from_file:
             self.load_from(from_file)
 
@@ -402,6 +409,7 @@ class MXEncoder(SMTEncoder):
             self.traverse(tree.children[1], clid, prefix + [-var])
         else:  # leaf node
             leaf = self.idmgr.id(tuple(sorted(prefix)))
+            self.leafpaths[leaf] = prefix
 
             if prefix:
                 # encoding the path only if necessary
@@ -457,6 +465,14 @@ class MXEncoder(SMTEncoder):
         for tree in self.ensemble.trees:
             traverse_intervals(tree)
 
+        # thresholds of the attack layer (if any), for
+        # its tests to be expressible over the intervals
+        if self.optns.attack:
+            for rules in self.attack_tests():
+                for label, tests in rules:
+                    for feat, op, thr in tests:
+                        self.intvs[feat].update(attack_bounds(op, thr))
+
         # filtering out variables that do not appear in the trees
         self.intvs = dict(filter(lambda x: len(x[1]) != 0, self.intvs.items()))
 
@@ -504,6 +520,59 @@ class MXEncoder(SMTEncoder):
             for v, ub in zip(self.ivars[feat], self.intvs[feat]):
                 self.vid2fid[v] = (feat, ub)
 
+    def attack_tests(self):
+        """
+            The biased and the unbiased rule lists of the attack layer (see
+            --attack), each rule given by its label and its threshold tests
+            as (feature, operator, threshold) triples.
+        """
+
+        assert not self.xgb.use_categorical, 'Do not handle yet the case of categrorical data'
+
+        layer = []
+        for rules in (self.xgb.biasLayer, self.xgb.unbiasLayer):
+            layer.append([])
+
+            for rule in rules:
+                tests = []
+                for f in rule:
+                    if f != 'class':
+                        feat = 'f{0}'.format(self.xgb.feature_names.index(f))
+                        tests.append((feat, rule[f]['operator'], float(rule[f]['threshold'])))
+
+                layer[-1].append((rule['class'], tests))
+
+        return layer
+
+    def attack_layer(self):
+        """
+            The rule lists of the attack layer, as returned by
+            attack_tests(), with each test replaced by a literal over the
+            order and the interval variables.
+        """
+
+        layer = []
+        for rules in self.attack_tests():
+            layer.append([])
+
+            for label, tests in rules:
+                lits = []
+                for feat, op, thr in tests:
+                    bounds = attack_bounds(op, thr)
+                    i = self.imaps[feat][bounds[-1]]
+
+                    if op in ('=', '=='):
+                        # the interval holding the threshold only
+                        lits.append(self.ivars[feat][i])
+                    elif op in ('<', '<='):
+                        lits.append( self.lvars[feat][i])
+                    else:
+                        lits.append(-self.lvars[feat][i])
+
+                layer[-1].append((label, lits))
+
+        return layer
+
     def encode(self):
         """
             Do the job.
@@ -641,7 +710,7 @@ class MXEncoder(SMTEncoder):
         else:
             ortype = 'int'
         with MXReasoner(self.enc, cwinner, solver=self.optns.solver,
-                oracle=ortype) as x:
+                oracle=ortype, persist=self.optns.persist) as x:
             assert x.get_coex(hypos) == None, 'Wrong class predicted by the encoding'
             escores = x.get_scores()
 
@@ -759,3 +828,165 @@ class MXEncoder(SMTEncoder):
                 self.feats = line[11:].strip().split(', ')
             elif line.startswith('c classes:'):
                 self.nofcl = int(line[10:].strip())
+
+    def digest(self):
+        """
+            Hash of the booster, of the features and of the options the
+            encoding depends on (including the attack layer, which adds
+            interval boundaries).
+        """
+
+        h = hashlib.sha1()
+        h.update(bytes(self.model.get_booster().save_raw()))
+        h.update(repr((self.nofcl, self.xgb.extended_feature_names_as_array_strings,
+            self.optns.cardenc, self.optns.relax)).encode('utf-8'))
+
+        if self.optns.attack:
+            with open(self.optns.attack, 'rb') as fp:
+                h.update(fp.read())
+
+        return h.hexdigest()
+
+    def save_bin(self, dirname):
+        """
+            Save the encoding into a directory of numpy arrays (clauses, leaves
+            and trees of all the classes, and the interval tables), which can
+            be memory-mapped by load_bin(). The directory is created
+            atomically, so concurrent runs can share it.
+        """
+
+        arrs = {'lits': [], 'clause_offs': [0], 'class_offs': [0],
+                'leaf_lits': [], 'leaf_wghts': [], 'leaf_offs': [0],
+                'trees': [], 'tree_offs': [0]}
+
+        for clid in range(self.nofcl):
+            for cl in self.enc[clid].formula.clauses:
+                arrs['lits'].extend(cl)
+                arrs['clause_offs'].append(len(arrs['lits']))
+            arrs['class_offs'].append(len(arrs['clause_offs']) - 1)
+
+            for lit, wght in self.enc[clid].leaves:
+                arrs['leaf_lits'].append(lit)
+                arrs['leaf_wghts'].append(float(wght))
+            arrs['leaf_offs'].append(len(arrs['leaf_lits']))
+
+            arrs['trees'].extend(self.enc[clid].trees)
+            arrs['tree_offs'].append(len(arrs['trees']))
+
+        # interval tables, '+' being the infinity; the order of the
+        # features is kept, as it determines the positions of make_varpos()
+        feats = list(self.intvs.keys())
+        arrs.update({'ubs': [], 'ivars': [], 'lvars': [], 'intv_offs': [0]})
+        for f in feats:
+            arrs['ubs'].extend([float('inf') if ub == '+' else ub for ub in self.intvs[f]])
+            arrs['ivars'].extend(self.ivars[f])
+            arrs['lvars'].extend(self.lvars[f])
+            arrs['intv_offs'].append(len(arrs['ubs']))
+
+        # paths of the leaves
+        arrs.update({'path_leaves': [], 'path_lits': [], 'path_offs': [0]})
+        for leaf, prefix in self.leafpaths.items():
+            arrs['path_leaves'].append(leaf)
+            arrs['path_lits'].extend(prefix)
+            arrs['path_offs'].append(len(arrs['path_lits']))
+
+        types = {'leaf_wghts': np.float64, 'ubs': np.float64, 'clause_offs': np.int64}
+
+        tmp = '{0}.{1}.tmp'.format(dirname, os.getpid())
+        os.makedirs(tmp, exist_ok=True)
+
+        for name, arr in arrs.items():
+            np.save(os.path.join(tmp, name + '.npy'), np.array(arr,
+                dtype=types.get(name, np.int32)).reshape((-1, 2) if name == 'trees' else -1))
+
+        with open(os.path.join(tmp, 'meta.json'), 'w') as fp:
+            json.dump({'nofcl': self.nofcl, 'nv': self.idmgr.top, 'feats': feats}, fp)
+
+        try:
+            os.rename(tmp, dirname)
+        except OSError:
+            # another run got there first
+            for name in os.listdir(tmp):
+                os.remove(os.path.join(tmp, name))
+            os.rmdir(tmp)
+
+    def load_bin(self, dirname):
+        """
+            Memory-map an encoding saved by save_bin(). The result is the
+            same as that of encode().
+        """
+
+        with open(os.path.join(dirname, 'meta.json'), 'r') as fp:
+            meta = json.load(fp)
+
+        arrs = {}
+        for fname in os.listdir(dirname):
+            if fname.endswith('.npy'):
+                arrs[fname[:-4]] = np.load(os.path.join(dirname, fname), mmap_mode='r')
+
+        coffs = arrs['clause_offs']
+
+        self.enc = {}
+        for clid in range(meta['nofcl']):
+            beg, end = int(arrs['class_offs'][clid]), int(arrs['class_offs'][clid + 1])
+
+            # literals of the clauses of this class
+            lits = arrs['lits'][coffs[beg]:coffs[end]].tolist()
+            offs = (coffs[beg:end + 1] - coffs[beg]).tolist()
+
+            formula = CNF()
+            formula.clauses = [lits[offs[i]:offs[i + 1]] for i in range(end - beg)]
+            formula.nv = meta['nv']
+
+            beg, end = int(arrs['leaf_offs'][clid]), int(arrs['leaf_offs'][clid + 1])
+            leaves = [(l, Decimal(repr(w))) for l, w in zip(arrs['leaf_lits'][beg:end].tolist(),
+                arrs['leaf_wghts'][beg:end].tolist())]
+
+            beg, end = int(arrs['tree_offs'][clid]), int(arrs['tree_offs'][clid + 1])
+            trees = [tuple(t) for t in arrs['trees'][beg:end].tolist()]
+
+            self.enc[clid] = ClassEnc(formula=formula, leaves=leaves, trees=trees)
+
+        self.intvs, self.imaps, self.ivars, self.lvars = {}, {}, {}, {}
+        for i, f in enumerate(meta['feats']):
+            beg, end = int(arrs['intv_offs'][i]), int(arrs['intv_offs'][i + 1])
+
+            self.intvs[f] = arrs['ubs'][beg:end - 1].tolist() + ['+']
+            self.imaps[f] = {ub: j for j, ub in enumerate(self.intvs[f])}
+            self.ivars[f] = arrs['ivars'][beg:end].tolist()
+            self.lvars[f] = arrs['lvars'][beg:end].tolist()
+
+        # mapping variable ids to feature ids
+        for feat in self.ivars:
+            for v, ub in zip(self.ivars[feat], self.intvs[feat]):
+                self.vid2fid[v] = (feat, ub)
+
+        if 'path_leaves' in arrs:
+            lits, offs = arrs['path_lits'].tolist(), arrs['path_offs'].tolist()
+            for i, leaf in enumerate(arrs['path_leaves'].tolist()):
+                self.leafpaths[leaf] = lits[offs[i]:offs[i + 1]]
+
+        self.make_varpos()
+
+        return self.enc, self.intvs, self.imaps, self.ivars
+
+
+#
+#==============================================================================
+def attack_bounds(op, threshold):
+    """
+        Interval boundaries needed to express a threshold test of the attack
+        layer, given that an interval includes its lower bound but not its
+        upper bound. A test 'x <= t' is expressed as 'x < t+', where t+ is
+        the float following t; a test 'x == t' needs the interval [t, t+).
+    """
+
+    succ = float(np.nextafter(threshold, np.inf))
+
+    if op in ('<', '>='):
+        return [threshold]
+    elif op in ('<=', '>'):
+        return [succ]
+    else:
+        assert op in ('=', '=='), 'invalid operator {0}'.format(op)
+        return [threshold, succ]
@@ -12,7 +12,7 @@
 #==============================================================================
 from __future__ import print_function
 import collections
-from copy import deepcopy
+from copy import copy, deepcopy
 import functools
 import itertools
 from math import ceil, copysign
@@ -20,6 +20,7 @@ import namedlist
 from pysat.examples.rc2 import RC2, RC2Stratified
 from pysat.formula import IDPool
 from pysat.solvers import Solver
+import threading
 
 
 # a named tuple for storing the information associated with a core
@@ -106,9 +107,11 @@ class ERC2(RC2Stratified):
     """
 
     def __init__(self, formula, solver='g3', adapt=False, blo='div',
-            exhaust=False, incr=False, minz=False, trim=0, verbose=0):
+            exhaust=False, incr=False, minz=False, trim=0, verbose=0,
+            coredb=None, dbname=None):
         """
-            Initialiser.
+            Initialiser. The unit cores of full instances can be kept in a
+            store (see CoreStore), under the given name.
         """
 
         super(ERC2, self).__init__(formula, solver=solver, adapt=adapt,
@@ -151,6 +154,24 @@ class ERC2(RC2Stratified):
         # set of all possible full-instances considered so far
         self.instances = set()
 
+        # number of cores reused by the last call
+        self.reused = 0
+
+        # whether the hard part was unsatisfiable in the last call,
+        # which may be the case if the formula has extra hard clauses
+        self.infeasible = False
+
+        # persistent store of unit cores, the unit cores of the current
+        # full instance known from it and those detected by this run
+        self.coredb, self.dbname = coredb, dbname
+        self.known, self.ucores = None, []
+
+        # cancellation of the current call from another thread
+        # (used by the race of MXReasoner), see make_cancellable()
+        self.cancel_lock = None
+        self.cancelled = False
+        self.solving = False
+
     def delete(self):
         """
             Destructor.
@@ -166,7 +187,7 @@ class ERC2(RC2Stratified):
     def save_state(self):
         """
             Saving the base case state of the solver after the base case
-            is finished.
+            is finished. The saved copies are never modified afterwards.
         """
 
         self.cost_copy = self.cost
@@ -194,25 +215,31 @@ class ERC2(RC2Stratified):
     def load_state(self, extra_hard):
         """
             Loading the base case state of the solver whenever necessary.
+            This is done for every call, so the saved copies are copied
+            shallowly: all of them hold literals and weights, except for
+            wstr, whose lists are extended in place (and so are copied
+            too), and s2cl, whose clauses are never modified.
         """
 
         self.cost = self.cost_copy
-        self.sels = deepcopy(self.sels_copy)
-        self.sels_set = deepcopy(self.sset_copy)
-        self.smap = deepcopy(self.smap_copy)
-        self.sall = deepcopy(self.sall_copy)
-        self.s2cl = deepcopy(self.s2cl_copy)
-        self.sneg = deepcopy(self.sneg_copy)
-        self.wght = deepcopy(self.wght_copy)
-        self.sums = deepcopy(self.sums_copy)
-        self.bnds = deepcopy(self.bnds_copy)
+        self.sels = self.sels_copy[:]
+        self.sels_set = set(self.sset_copy)
+        self.smap = dict(self.smap_copy)
+        self.sall = self.sall_copy[:]
+        self.s2cl = dict(self.s2cl_copy)
+        self.sneg = set(self.sneg_copy)
+        self.wght = dict(self.wght_copy)
+        self.sums = self.sums_copy[:]
+        self.bnds = dict(self.bnds_copy)
         self.levl = self.levl_copy
-        self.wstr = deepcopy(self.wstr_copy)
-        self.blop = deepcopy(self.blop_copy)  # a list of blo levels
+        self.wstr = copy(self.wstr_copy)
+        for w in self.wstr:
+            self.wstr[w] = self.wstr[w][:]
+        self.blop = self.blop_copy[:]  # a list of blo levels
         self.sdiv = self.sdiv_copy
         self.done = self.done_copy
-        self.bckp = deepcopy(self.bckp_copy)
-        self.bckp_set = deepcopy(self.sbck_copy)
+        self.bckp = self.bckp_copy[:]
+        self.bckp_set = set(self.sbck_copy)
 
         self.slack = self.slck_copy
         self.ubcost = None
@@ -225,6 +252,7 @@ class ERC2(RC2Stratified):
         self.ehset = set(self.ehard)
 
         self.reason = set()
+        self.reused = 0
 
     def get_reason(self):
         """
@@ -244,6 +272,7 @@ class ERC2(RC2Stratified):
 
         # remembering if we need to terminate early
         self.estop = early_stop
+        self.infeasible = False
 
         # additional processing in case of a full-instance
         if full_instance:
@@ -260,6 +289,11 @@ class ERC2(RC2Stratified):
         # first, loading the solver state
         self.load_state(extra_hard)
 
+        if full_instance:
+            # unit cores found by an earlier run (if any) and by this one
+            self.known = self.load_unit_cores()
+            self.ucores = []
+
         # first attempt to get an optimization level
         self.next_level()
 
@@ -334,11 +368,12 @@ class ERC2(RC2Stratified):
             return False
 
         # main solving loop
-        while not self.oracle.solve(assumptions=self.ehard + self.sels + self.sums):
+        while not self.call_oracle(self.ehard + self.sels + self.sums):
             self.get_core_ext()
 
             if not self.core:
                 # core is empty, i.e. hard part is unsatisfiable
+                self.infeasible = True
                 return False
 
             # processing the core
@@ -352,8 +387,60 @@ class ERC2(RC2Stratified):
             if self.estop and self.cost > self.slack:
                 return False
 
+        # the call was cancelled, there is no model
+        if self.cancelled:
+            return False
+
         return True
 
+    def make_cancellable(self):
+        """
+            Let the calls be cancelled by another thread (see cancel()).
+        """
+
+        self.cancel_lock = threading.RLock()
+
+    def cancel(self):
+        """
+            Cancel the current call (from another thread). It returns no
+            model, as soon as the SAT call in progress is interrupted. The
+            next call starts from the base case state as usual and all the
+            cores recorded so far remain valid.
+        """
+
+        with self.cancel_lock:
+            self.cancelled = True
+
+            if self.solving:
+                self.oracle.interrupt()
+
+    def call_oracle(self, assumptions):
+        """
+            A SAT call of the main loop of compute_ext(). If calls can be
+            cancelled, the SAT call can be interrupted; an interrupted (or
+            cancelled) call is reported as satisfiable, so that the loop
+            stops.
+        """
+
+        if not self.cancel_lock:
+            return self.oracle.solve(assumptions=assumptions)
+
+        # the interrupt flag is only set during solve_limited(), since
+        # other SAT calls (e.g. core minimization) must not be stopped
+        with self.cancel_lock:
+            if self.cancelled:
+                return True
+
+            self.solving = True
+
+        res = self.oracle.solve_limited(assumptions=assumptions, expect_interrupt=True)
+
+        with self.cancel_lock:
+            self.solving = False
+            self.oracle.clear_interrupt()
+
+        return res != False
+
     def reuse_cores(self):
         """
             Detect cores and reuse them using the known core dependencies.
@@ -399,6 +486,8 @@ class ERC2(RC2Stratified):
 
                     break
 
+        self.reused += found
+
         if self.verbose > 1 and found:
             print('c cores reused:', found)
 
@@ -443,6 +532,8 @@ class ERC2(RC2Stratified):
         # remove the corresponding assumptions
         self.filter_assumps()
 
+        self.reused += found
+
         if self.verbose > 1 and found:
             print('c unit cores reused:', found)
 
@@ -459,10 +550,19 @@ class ERC2(RC2Stratified):
 
         # checking all available selectors
         for l in self.sels:
-            st, props = self.oracle.propagate(assumptions=self.ehard + [l],
-                    phase_saving=2)
+            if self.known is not None:
+                # the unit cores of this instance are known
+                if l not in self.known:
+                    continue
+
+                reason = self.known[l]
+            else:
+                st, props = self.oracle.propagate(assumptions=self.ehard + [l],
+                        phase_saving=2)
+
+                if st:
+                    continue
 
-            if not st:
                 # propagating this literal results in a conflict
                 # now, we need to attribute responsibility to some
                 # of the hard assupmtions
@@ -472,19 +572,21 @@ class ERC2(RC2Stratified):
                     if ll in self.ehset:
                         reason.append(ll)
 
-                # recording the core for later detection and reuse
-                self.record_core(-l, reason=reason)
+                self.ucores.append((l, reason))
 
-                # updating the reason
-                self.reason = self.reason.union(set(reason))
+            # recording the core for later detection and reuse
+            self.record_core(-l, reason=reason)
 
-                # updating the cost
-                self.cost += self.wght[l]
+            # updating the reason
+            self.reason = self.reason.union(set(reason))
 
-                # marking as garbage
-                self.garbage.add(l)
+            # updating the cost
+            self.cost += self.wght[l]
+
+            # marking as garbage
+            self.garbage.add(l)
 
-                found += 1
+            found += 1
 
         # remove the corresponding assumptions
         self.filter_assumps()
@@ -492,9 +594,42 @@ class ERC2(RC2Stratified):
         # updating the set of selectors
         self.sels_set = set(self.sels)
 
+        # the unit cores found at all the levels so far are saved
+        if self.coredb and self.known is None:
+            self.coredb.save(self.dbname, self.ehard, self.ucores)
+
         if self.verbose > 1 and found:
             print('c new unit cores:', found)
 
+    def load_unit_cores(self):
+        """
+            Unit cores of the current full instance kept in the store (if
+            any), as a mapping from selectors to reasons. Each of them is
+            checked before use: the selector and its reason must be
+            inconsistent with the hard clauses, which unit propagation
+            normally shows (otherwise, a SAT call is made). If any of them
+            is not, the unit cores are detected from scratch.
+        """
+
+        if not self.coredb:
+            return None
+
+        cores = self.coredb.load(self.dbname, self.ehard)
+        if cores is None:
+            return None
+
+        for l, reason in cores:
+            if l not in self.wght or not set(reason) <= self.ehset:
+                return None
+
+            st, props = self.oracle.propagate(assumptions=reason + [l],
+                    phase_saving=2)
+
+            if st and self.oracle.solve(assumptions=reason + [l]):
+                return None
+
+        return dict(cores)
+
     def record_core(self, lsum, tobj=None, tbnd=0, reason=[]):
         """
             Record a new core and its reason.
@@ -13,9 +13,12 @@
 from __future__ import print_function
 import collections
 from functools import reduce
+import multiprocessing
 import numpy as np
 import os
-from .mxreason import MXReasoner, ClassEnc
+from .aggregate import OnlineIndices
+from .mxreason import AttackReasoner, MXReasoner, ClassEnc
+from .stats import OracleStats, TimedOracle
 from pysat.examples.hitman import Hitman
 from pysat.formula import IDPool
 from pysat.solvers import Solver as SATSolver
@@ -23,8 +26,9 @@ from pysmt.shortcuts import Solver
 from pysmt.shortcuts import And, BOOL, Implies, Not, Or, Symbol
 from pysmt.shortcuts import Equals, GT, Int, INT, Real, REAL, GE, LE, LT
 import resource
-from six.moves import range
+from six.moves import queue, range
 import sys
+import time
 
 
 #
@@ -52,7 +56,6 @@ class SMTExplainer(object):
         self.xgb = xgb
         
         self.verbose = self.optns.verb
-        self.oracle = Solver(name=options.solver)
 
         self.inps = []  # input (feature value) variables
         for f in self.xgb.extended_feature_names_as_array_strings:
@@ -65,14 +68,12 @@ class SMTExplainer(object):
         for c in range(self.nofcl):
             self.outs.append(Symbol('class{0}_score'.format(c), typename=REAL))
 
-        # theory
-        self.oracle.add_assertion(formula)
-        
-        if self.optns.attack:
-            self.encode_attacker()
+        # profile of the current instance
+        self.stats = OracleStats()
 
-        # current selector
-        self.selv = None
+        # theory
+        self.formula = formula
+        self.init_oracle()
 
         # save and use dual explanations whenever needed
         self.dualx = []
@@ -80,6 +81,44 @@ class SMTExplainer(object):
         # number of oracle calls involved
         self.calls = 0
 
+        # whether the last instance was explained within its budgets
+        self.complete = True
+
+        # portfolio processes enumerating AXps (see --xjobs)
+        self.workers = []
+
+        # latest MCSes (as sets of feature ids) seeding
+        # the enumeration of the next samples (see --warm)
+        self.warm = []
+
+    def init_oracle(self):
+        """
+            Create the oracle out of the encoding (and the attacker).
+        """
+
+        if 'oracle' in dir(self):
+            self.oracle.exit()
+
+        if self.optns.solver == 'z3native':
+            # Z3 called directly rather than through PySMT
+            from .z3oracle import Z3Oracle
+            self.oracle = TimedOracle(Z3Oracle(), self.stats)
+        else:
+            self.oracle = TimedOracle(Solver(name=self.optns.solver), self.stats)
+
+        self.oracle.add_assertion(self.formula)
+
+        if self.optns.attack:
+            self.encode_attacker()
+
+        # current selector
+        self.selv = None
+
+        # number of samples whose hypotheses are disabled but still
+        # kept by the oracle; once there are too many of them, the
+        # oracle is rebuilt from scratch
+        self.retired = 0
+
     def encode_attacker(self):
         # add last layer of Adversarial Attack classifier
         biased = [r for r in self.xgb.biasLayer] 
@@ -139,24 +178,28 @@ class SMTExplainer(object):
             # print(Implies(And(lits), q)) 
                 
         
-    def prepare(self, instance):
+    def prepare(self, instance, target=None):
         """
-            Prepare the oracle for computing an explanation.
+            Prepare the oracle for computing an explanation. The label of
+            the attack layer to explain is determined from the instance
+            unless it is given as the target.
         """
         
         sample, label = instance
+        self.instance = instance
 
         if self.selv:
             # disable the previous assumption if any
             self.oracle.add_assertion(Not(self.selv))
+            self.retired += 1
 
-        # creating a fresh selector for a new sample
-        sname = ','.join([str(v).strip() for v in sample])
+        if self.retired >= self.optns.xrebuild > 0:
+            # the hypotheses of the previous samples slow the oracle down
+            self.init_oracle()
 
-        # the samples should not repeat; otherwise, they will be
-        # inconsistent with the previously introduced selectors
-        assert sname not in self.idmgr.obj2id, 'this sample has been considered before (sample {0})'.format(self.idmgr.id(sname))
-        self.selv = Symbol('sample{0}_selv'.format(self.idmgr.id(sname)), typename=BOOL)
+        # creating a fresh selector for a new sample; a sample seen
+        # before gets a new one, as its old selector is disabled
+        self.selv = Symbol('sample{0}_selv'.format(self.idmgr.id()), typename=BOOL)
 
         self.rhypos = []  # relaxed hypotheses
 
@@ -203,6 +246,10 @@ class SMTExplainer(object):
         # and we need to remove them
         self.rhypos = sorted(set(self.rhypos), key=lambda x: int(x.symbol_name()[6:]))
 
+        # mapping from internal Z3 variables into hypotheses (for cores)
+        if self.optns.solver in ('z3', 'z3native'):
+            self.vmap = {self.oracle.converter.convert(v): v for v in self.rhypos}
+
         # propagating the true observation
         if self.oracle.solve([self.selv] + self.rhypos):
             model = self.oracle.get_model()
@@ -223,6 +270,11 @@ class SMTExplainer(object):
         if self.optns.attack :
             outvals = [model.get_py_value(o) for o in self.adv_outs]
             self.out_id = max(zip(outvals, range(len(outvals))))[1] # argmax
+
+            # the hypotheses do not always determine the label, hence
+            # the workers of a portfolio use that of the coordinator
+            if target is not None:
+                self.out_id = target
             
             for i,o in enumerate(self.adv_outs):
                 if i != self.out_id:
@@ -254,18 +306,85 @@ class SMTExplainer(object):
             Hypotheses minimization.
         """
 
+        self.init_sample(sample, label)
+
+        self.time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
+                resource.getrusage(resource.RUSAGE_SELF).ru_utime
+
+        self.check_entailment()
+
+        expls = self.collect(self.enumerate(smallest))
+
+        self.time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
+                resource.getrusage(resource.RUSAGE_SELF).ru_utime - self.time
+
+        expls = list(map(lambda expl: sorted([self.sel2fid[h] for h in expl]) if expl is not None else None, expls))
+
+        if self.dualx:
+            self.dualx = list(map(lambda expl: sorted([self.sel2fid[h] for h in expl]), self.dualx))
+
+        if self.verbose:
+            if expls and expls[0] != None:
+                for expl in expls:
+                    preamble = [self.preamble[i] for i in expl]
+                    label = self.adv_targets[self.out_id] if self.optns.attack else \
+                                                    self.xgb.target_name[self.out_id]
+                    if self.optns.xtype == 'abd':
+                        print('  explanation: "IF {0} THEN {1}"'.format(' AND '.join(preamble), label))
+                    else:
+                        print('  explanation: "IF NOT {0} THEN NOT {1}"'.format(' AND NOT '.join(preamble), label))
+                    print('  # hypos left:', len(expl))
+
+            if not self.complete:
+                print('  incomplete: budget exhausted after {0} calls'.format(self.calls))
+
+            print('  calls:', self.calls)
+
+            print('  time: {0:.2f}'.format(self.time))
+
+        # here we return the last computed explanation
+        return expls
+
+    def iter_explanations(self, sample, smallest, label=None):
+        """
+            Explanations of a sample, as lists of feature ids, yielded one
+            by one as soon as they are found. The caller can stop at any
+            point, e.g. once the feature indices do not change anymore.
+        """
+
+        self.init_sample(sample, label)
+        self.check_entailment()
+
+        for expl in self.enumerate(smallest):
+            yield sorted([self.sel2fid[h] for h in expl]) if expl is not None else None
+
+    def init_sample(self, sample, label):
+        """
+            Prepare the oracle and the budgets for a new sample.
+        """
+
         # reinitializing the number of used oracle calls
         # 1 because of the initial call checking the entailment
         self.calls = 1
 
+        # starting the budgets and the profile of this instance
+        self.complete = True
+        self.wstart = time.time()
+        self.stats.reset()
+
         # adapt the solver to deal with the current sample
         self.prepare((sample,label))
 
+        # the oracle may have been rebuilt by prepare()
+        self.cstart = self.get_conflicts() if self.optns.xconflicts else 0
+
         # saving external explanation to be minimized further
         self.to_consider = [True for h in self.rhypos]
 
-        self.time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-                resource.getrusage(resource.RUSAGE_SELF).ru_utime
+    def check_entailment(self):
+        """
+            Make sure the hypotheses imply the prediction.
+        """
 
         # if satisfiable, then the observation is not implied by the hypotheses
         if self.oracle.solve([self.selv] + [h for h, c in zip(self.rhypos, self.to_consider) if c]):
@@ -273,12 +392,20 @@ class SMTExplainer(object):
             print(self.oracle.get_model())
             sys.exit(1)
 
+    def enumerate(self, smallest):
+        """
+            Explanations (as lists of hypotheses) of the current sample,
+            of the type given by --xtype, yielded one by one.
+        """
+
         if self.optns.xtype == 'abd':
-            # abductive explanations => MUS computation and enumeration
-            if not smallest and self.optns.xnum == 1:
-                expls = [self.compute_minimal_abductive()]
+            # abductive explanations => MUS computation and enumeration;
+            # with --xstate, a single AXp is enumerated to record the state
+            if not smallest and self.optns.xnum == 1 and not self.optns.xstate:
+                yield self.compute_minimal_abductive()
             else:
-                expls = self.enumerate_abductive(smallest=smallest)
+                for expl in self.enumerate_abductive(smallest=smallest):
+                    yield expl
         else:  # contrastive explanations => MCS enumeration
             if self.optns.use_mhs:
                 expls = self.enumerate_contrastive()
@@ -289,30 +416,173 @@ class SMTExplainer(object):
                     # expls = self.enumerate_smallest_contrastive()
                     expls = self.enumerate_contrastive()
 
-        self.time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-                resource.getrusage(resource.RUSAGE_SELF).ru_utime - self.time
+            for expl in expls:
+                yield expl
 
-        expls = list(map(lambda expl: sorted([self.sel2fid[h] for h in expl]), expls))
+    def collect(self, expls):
+        """
+            Gather the explanations yielded by an enumerator. With --xstable,
+            the enumeration is stopped (and is incomplete) once the feature
+            rankings of the indices have not changed for the given number
+            of explanations.
+        """
 
-        if self.dualx:
-            self.dualx = list(map(lambda expl: sorted([self.sel2fid[h] for h in expl]), self.dualx))
+        result = []
 
-        if self.verbose:
-            if expls[0] != None:
-                for expl in expls:
-                    preamble = [self.preamble[i] for i in expl]
-                    label = self.adv_targets[self.out_id] if self.optns.attack else \
-                                                    self.xgb.target_name[self.out_id]
-                    if self.optns.xtype == 'abd':
-                        print('  explanation: "IF {0} THEN {1}"'.format(' AND '.join(preamble), label))
-                    else:
-                        print('  explanation: "IF NOT {0} THEN NOT {1}"'.format(' AND NOT '.join(preamble), label))
-                    print('  # hypos left:', len(expl))
+        if self.optns.xstable:
+            indices = OnlineIndices(len(self.xgb.feature_names))
 
-            print('  time: {0:.2f}'.format(self.time))
+        for expl in expls:
+            result.append(expl)
 
-        # here we return the last computed explanation
-        return expls
+            if self.optns.xstable and expl is not None:
+                indices.update(set([self.sel2fid[h] for h in expl]))
+
+                if indices.stable(self.optns.xstable):
+                    # the enumerator saves its state when closed
+                    expls.close()
+                    self.complete = False
+                    break
+
+        return result
+
+    def get_conflicts(self):
+        """
+            Total number of conflicts spent by the oracle so far. Only Z3
+            reports it; other solvers are considered conflict-free.
+        """
+
+        if self.optns.solver not in ('z3', 'z3native'):
+            return 0
+
+        stats = self.oracle.z3.statistics()
+        return sum([stats.get_key_value(k) for k in stats.keys() if k in ('conflicts', 'sat conflicts')])
+
+    def out_of_budget(self):
+        """
+            Check whether any of the budgets of the current instance is
+            exhausted. If so, the explanations computed so far are
+            returned and marked as incomplete.
+        """
+
+        if self.optns.xtime and time.time() - self.wstart >= self.optns.xtime:
+            self.complete = False
+        elif self.optns.xcalls and self.calls >= self.optns.xcalls:
+            self.complete = False
+        elif self.optns.xconflicts and self.get_conflicts() - self.cstart >= self.optns.xconflicts:
+            self.complete = False
+
+        return not self.complete
+
+    def get_core(self):
+        """
+            Hypotheses in the unsatisfiable core of the last oracle call.
+            Only Z3 reports cores.
+        """
+
+        core = self.oracle.z3.unsat_core()
+        core = sorted(filter(lambda x: x != None, map(lambda x: self.vmap.get(x), core)), key=lambda x: int(x.symbol_name()[6:]))
+
+        self.stats.core(core)
+        return core
+
+    def trim_core(self, core):
+        """
+            Trim an unsatisfiable core by calling the oracle on it at most
+            the number of times given by --trim.
+        """
+
+        for i in range(self.optns.trim):
+            self.calls += 1
+            self.oracle.solve([self.selv] + core)
+            new_core = self.get_core()
+            if len(core) == len(new_core):
+                break
+            core = new_core
+
+        return core
+
+    def is_satisfied(self, model, h):
+        """
+            Check whether a model agrees with the sample on the feature(s)
+            of hypothesis h.
+        """
+
+        i = self.sel2fid[self.rhypos[h]]
+        if '_' not in self.inps[i].symbol_name():
+            # feature variable and its expected value
+            var, exp = self.inps[i], self.sample[i]
+
+            # true value
+            true_val = float(model.get_py_value(var))
+
+            return exp - 0.001 <= true_val <= exp + 0.001
+        else:
+            for vid in self.sel2vid[self.rhypos[h]]:
+                var, exp = self.inps[vid], int(self.sample[vid])
+
+                # true value
+                true_val = int(model.get_py_value(var))
+
+                if exp != true_val:
+                    return False
+
+            return True
+
+    def extract_mcs(self, hset, unsatisfied):
+        """
+            Extract an MCS out of the hypotheses falsified by a model of
+            the hypotheses in hset, which is extended to the complement.
+            Chunks of hypotheses are tested at once, QuickXplain-style:
+            the chunk size grows while chunks are satisfiable and shrinks
+            when they are not. Unsatisfiable cores (Z3 only) narrow the
+            chunk down to the hypotheses responsible for the conflict, and
+            every model obtained is used to move all the hypotheses it
+            satisfies into hset without calling the oracle.
+        """
+
+        use_cores = self.optns.solver in ('z3', 'z3native')
+
+        mcs, todo = [], unsatisfied[:]
+        size = max(1, len(todo) // 2) if self.optns.reduce == 'qxp' else 1
+
+        while todo:
+            chunk = todo[:size]
+
+            self.calls += 1
+            if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset + chunk]):
+                hset.extend(chunk)
+
+                # the new model may satisfy more of the hypotheses
+                model = self.oracle.get_model()
+                todo = todo[size:]
+                hset.extend([h for h in todo if self.is_satisfied(model, h)])
+                todo = [h for h in todo if h not in hset]
+
+                if self.optns.reduce == 'qxp':
+                    size *= 2
+            elif len(chunk) == 1:
+                mcs.append(chunk[0])
+                todo = todo[1:]
+            else:
+                culprits = chunk
+                if use_cores:
+                    core = self.get_core()
+                    if len(core) > 1 and self.optns.trim:
+                        core = self.trim_core(core)
+
+                    culprits = [h for h in chunk if self.rhypos[h] in core]
+
+                if len(culprits) == 1:
+                    # hset + culprit is unsatisfiable
+                    mcs.append(culprits[0])
+                    todo.remove(culprits[0])
+                else:
+                    # the conflict is among the culprits; test them first
+                    todo = culprits + [h for h in todo if h not in culprits]
+                    size = max(1, len(culprits) // 2)
+
+        return mcs
 
     def compute_minimal_abductive(self):
         """
@@ -325,7 +595,11 @@ class SMTExplainer(object):
         rhypos = [h for h, c in zip(self.rhypos, self.to_consider) if c]
 
         # simple deletion-based linear search
+        # (if interrupted, rhypos is still an explanation, not a minimal one)
         while i < len(rhypos):
+            if self.out_of_budget():
+                break
+
             to_test = rhypos[:i] + rhypos[(i + 1):]
 
             self.calls += 1
@@ -417,6 +691,9 @@ class SMTExplainer(object):
 
         self.calls += 1
         while self.oracle.solve([self.selv]) and (len(expls) < self.optns.xnum):
+            if self.out_of_budget():
+                break
+
             self.ss_assumps, self.bb_assumps, self.setd = [], [], []
             _overapprox()
             _compute()
@@ -431,104 +708,427 @@ class SMTExplainer(object):
             self.calls += 1
 
         self.calls += self.cldid
-        return expls if expls else [None]
+
+        # no explanation at all only if the budget allows it
+        return expls if expls or not self.complete else [None]
 
     def enumerate_abductive(self, smallest=True):
         """
-            Compute a cardinality-minimal explanation.
+            Enumerate cardinality- (or subset-) minimal explanations,
+            yielding each of them as soon as it is found.
         """
 
-        # result
-        expls = []
+        if self.optns.xjobs > 1 and not multiprocessing.current_process().daemon:
+            # daemonic processes (e.g. of --jobs) cannot have a portfolio
+            for expl in self.enumerate_abductive_portfolio(smallest=smallest):
+                yield expl
+            return
 
-        # just in case, let's save dual (contrastive) explanations
-        self.dualx = []
+        # MCSes and AXps found so far (by an earlier run, if any)
+        mcses, axps, exhausted = self.load_state()
+
+        self.dualx = [[self.rhypos[i] for i in mcs] for mcs in mcses]
+        expls = [[self.rhypos[i] for i in axp] for axp in axps]
+        if self.optns.xnum > 0:
+            expls = expls[:self.optns.xnum]
+
+        for expl in expls:
+            yield expl
+
+        # correction sets carried over from the previous samples
+        seeds = self.warm_start(mcses) if not exhausted else []
 
         with Hitman(bootstrap_with=[[i for i in range(len(self.rhypos)) if self.to_consider[i]]], htype='sorted' if smallest else 'lbx') as hitman:
-            # computing unit-size MCSes
-            for i, hypo in enumerate(self.rhypos):
-                if self.to_consider[i] == False:
-                    continue
+            for mcs in mcses + seeds:
+                hitman.hit(mcs)
 
-                self.calls += 1
-                if self.oracle.solve([self.selv] + self.rhypos[:i] + self.rhypos[(i + 1):]):
-                    hitman.hit([i])
-                    self.dualx.append([self.rhypos[i]])
+            for axp in axps:
+                hitman.block(axp)
 
-            # main loop
+            # main loop (the state is saved even if the caller stops early)
             iters = 0
-            while True:
-                hset = hitman.get()
-                iters += 1
+            try:
+                while not exhausted and len(expls) != self.optns.xnum:
+                    if self.out_of_budget():
+                        break
 
-                if self.verbose > 1:
-                    print('iter:', iters)
-                    print('cand:', hset)
+                    hset = self.stats.get(hitman)
+                    iters += 1
 
-                if hset == None:
-                    break
+                    if self.verbose > 1:
+                        print('iter:', iters)
+                        print('cand:', hset)
 
-                self.calls += 1
-                if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset]):
-                    to_hit = []
-                    satisfied, unsatisfied = [], []
+                    if hset == None:
+                        exhausted = True
+                        break
 
-                    removed = list(set(range(len(self.rhypos))).difference(set(hset)))
+                    self.calls += 1
+                    if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset]):
+                        mark = self.stats.mark()
+                        to_hit = self.compute_mcs(hset)
+                        self.stats.reduced(mark)
 
-                    model = self.oracle.get_model()
-                    for h in removed:
-                        i = self.sel2fid[self.rhypos[h]]
-                        if '_' not in self.inps[i].symbol_name():
-                            # feature variable and its expected value
-                            var, exp = self.inps[i], self.sample[i]
+                        if self.verbose > 1:
+                            print('coex:', to_hit)
 
-                            # true value
-                            true_val = float(model.get_py_value(var))
+                        hitman.hit(to_hit)
 
-                            if not exp - 0.001 <= true_val <= exp + 0.001:
-                                unsatisfied.append(h)
-                            else:
-                                hset.append(h)
-                        else:
-                            for vid in self.sel2vid[self.rhypos[h]]:
-                                var, exp = self.inps[vid], int(self.sample[vid])
+                        self.dualx.append([self.rhypos[i] for i in to_hit])
+                        mcses.append(to_hit)
+                    else:
+                        if self.verbose > 1:
+                            print('expl:', hset)
 
-                                # true value
-                                true_val = int(model.get_py_value(var))
+                        expl = [self.rhypos[i] for i in hset]
+                        expls.append(expl)
+                        axps.append(hset)
 
-                                if exp != true_val:
-                                    unsatisfied.append(h)
-                                    break
-                            else:
-                                hset.append(h)
+                        yield expl
 
-                    # computing an MCS (expensive)
-                    for h in unsatisfied:
-                        self.calls += 1
-                        if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset] + [self.rhypos[h]]):
-                            hset.append(h)
+                        if len(expls) != self.optns.xnum:
+                            hitman.block(hset)
                         else:
-                            to_hit.append(h)
+                            break
+            finally:
+                self.save_state(mcses, axps, exhausted)
+                self.remember(mcses + seeds)
 
-                    if self.verbose > 1:
-                        print('coex:', to_hit)
+    def unit_mcses(self):
+        """
+            Detect the unit-size MCSes, i.e. the hypotheses whose removal
+            alone breaks the entailment.
+        """
 
-                    hitman.hit(to_hit)
+        units = []
+
+        for i, hypo in enumerate(self.rhypos):
+            if self.to_consider[i] == False:
+                continue
+
+            self.calls += 1
+            if self.oracle.solve([self.selv] + self.rhypos[:i] + self.rhypos[(i + 1):]):
+                units.append(i)
+
+        return units
+
+    def warm_start(self, mcses):
+        """
+            Correction sets of the current sample among the latest MCSes
+            of the samples explained before (see --warm). Each of them is
+            checked with a single oracle call: the hypotheses it leaves
+            out must not entail the prediction. A correction set need not
+            be minimal to be hit; those already hit by a known MCS are
+            skipped.
+        """
+
+        if not self.optns.warm:
+            return []
+
+        fid2hid = {self.sel2fid[h]: i for i, h in enumerate(self.rhypos)}
+        known = [set(mcs) for mcs in mcses]
+
+        seeds = []
+        for fids in self.warm:
+            if not all([f in fid2hid for f in fids]):
+                continue
+
+            cs = sorted([fid2hid[f] for f in fids])
+            if any([mcs <= set(cs) for mcs in known]):
+                continue
+
+            self.calls += 1
+            if self.oracle.solve([self.selv] + [h for i, h in enumerate(self.rhypos) if i not in cs]):
+                seeds.append(cs)
+                known.append(set(cs))
+
+        return seeds
+
+    def remember(self, mcses):
+        """
+            Keep the latest non-unit MCSes (unit ones are detected anyway)
+            to seed the enumeration of the next samples (see --warm).
+        """
+
+        if not self.optns.warm:
+            return
+
+        latest = []
+        for mcs in reversed(mcses):
+            fids = frozenset([self.sel2fid[self.rhypos[i]] for i in mcs])
+            if len(fids) > 1 and fids not in latest:
+                latest.append(fids)
+
+        self.warm = (latest + [fids for fids in self.warm if fids not in latest])[:self.optns.warm]
 
-                    self.dualx.append([self.rhypos[i] for i in to_hit])
+    def load_state(self):
+        """
+            MCSes and AXps (as lists of hypothesis indices) known for the
+            current sample and whether these are all its AXps. With
+            --xstate, they come from the earlier runs that enumerated the
+            sample (if any); otherwise, the unit-size MCSes are computed.
+        """
+
+        if self.optns.xstate:
+            if 'xstore' not in dir(self):
+                from .xcache import EnumerationStore
+                self.xstore = EnumerationStore(self.optns.xstate, self.optns)
+
+            state = self.xstore.load(self.sample)
+
+            # indices are meaningless if the hypotheses differ
+            if state and state['hypos'] == [h.symbol_name() for h in self.rhypos]:
+                return state['mcses'], state['axps'], state['done']
+
+        return [[i] for i in self.unit_mcses()], [], False
+
+    def save_state(self, mcses, axps, exhausted):
+        """
+            Record the MCSes and AXps known for the current sample, so that
+            a later run can resume the enumeration (see --xstate).
+        """
+
+        if self.optns.xstate:
+            self.xstore.save(self.sample, {'hypos': [h.symbol_name() for h in self.rhypos],
+                'mcses': mcses, 'axps': axps, 'done': exhausted})
+
+    def compute_mcs(self, hset):
+        """
+            Compute an MCS given a candidate hset the oracle has just found
+            satisfiable; hset is extended to the complement of the MCS.
+        """
+
+        to_hit = []
+        unsatisfied = []
+
+        removed = list(set(range(len(self.rhypos))).difference(set(hset)))
+
+        model = self.oracle.get_model()
+        for h in removed:
+            if self.is_satisfied(model, h):
+                hset.append(h)
+            else:
+                unsatisfied.append(h)
+
+        if self.optns.reduce != 'none':
+            # computing an MCS with chunks, cores and models
+            return self.extract_mcs(hset, unsatisfied)
+
+        # computing an MCS (expensive)
+        for h in unsatisfied:
+            self.calls += 1
+            if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset] + [self.rhypos[h]]):
+                hset.append(h)
+            else:
+                to_hit.append(h)
+
+        return to_hit
+
+    def enumerate_abductive_portfolio(self, smallest=True):
+        """
+            Enumerate (and yield) abductive explanations with a portfolio
+            of --xjobs processes. Each of them has its own oracle and its
+            own hitting set enumerator (with the hypotheses in a different
+            order) and checks its own candidates; the MCSes and AXps found are
+            passed on to all the others by this (coordinating) process.
+            Once any of them runs out of candidates, all the AXps are
+            known, so the result is the same as that of the sequential
+            enumeration up to the order (and up to the choice of the AXps
+            if their number is limited by --xnum). The calls made by the
+            workers are counted but not profiled (see OracleStats).
+        """
+
+        if not self.workers:
+            # the workers are forked and inherit the encoding; they
+            # serve all the samples explained by this explainer
+            ctx = multiprocessing.get_context('fork')
+            self.outbox = ctx.Queue()
+
+            for wid in range(self.optns.xjobs):
+                inbox = ctx.Queue()
+                proc = ctx.Process(target=self.portfolio_worker, args=(wid, inbox, self.outbox))
+                proc.daemon = True
+                proc.start()
+                self.workers.append((proc, inbox))
+
+        # MCSes and AXps found so far (by an earlier run, if any)
+        mcses, axps, exhausted = self.load_state()
+
+        self.dualx = [[self.rhypos[i] for i in mcs] for mcs in mcses]
+        expls = [[self.rhypos[i] for i in axp] for axp in axps]
+        if self.optns.xnum > 0:
+            expls = expls[:self.optns.xnum]
+
+        for expl in expls:
+            yield expl
+
+        # correction sets carried over from the previous samples
+        seeds = self.warm_start(mcses) if not exhausted else []
+
+        calls, wcalls = self.calls, {}
+        found = set([tuple(sorted(axp)) for axp in axps])
+        done = exhausted or len(expls) == self.optns.xnum
+
+        # the workers are not needed if the earlier runs did enough
+        started = not done
+        if started:
+            for proc, inbox in self.workers:
+                inbox.put(('start', self.instance, self.out_id, mcses + seeds, axps, smallest))
+
+        # the workers are stopped (and the state is
+        # saved) even if the caller stops early
+        late = []
+        try:
+            while not done:
+                try:
+                    kind, wid, ncalls, hset = self.outbox.get(timeout=0.1)
+                except queue.Empty:
+                    done = self.out_of_budget()
+                    continue
+
+                wcalls[wid] = ncalls
+                self.calls = calls + sum(wcalls.values())
+
+                if kind == 'mcs':
+                    # the hypotheses entail the target, so an empty MCS
+                    # means the worker explains a different one
+                    if not hset:
+                        raise RuntimeError('Worker {0} found an empty MCS'.format(wid))
+
+                    self.dualx.append([self.rhypos[i] for i in hset])
+                    mcses.append(hset)
+                    share = 'hit'
+                elif kind == 'axp' and tuple(sorted(hset)) not in found:
+                    found.add(tuple(sorted(hset)))
+                    expls.append([self.rhypos[i] for i in hset])
+                    axps.append(hset)
+
+                    done = len(expls) == self.optns.xnum
+                    share = 'block'
                 else:
-                    if self.verbose > 1:
-                        print('expl:', hset)
+                    # either a known AXp or all the AXps
+                    # are blocked by this worker, i.e. done
+                    exhausted = exhausted or kind == 'done'
+                    done = done or exhausted
+                    share = None
+
+                if share:
+                    for w, (proc, inbox) in enumerate(self.workers):
+                        if w != wid:
+                            inbox.put((share, hset))
+
+                if share == 'block':
+                    yield expls[-1]
+
+                done = done or self.out_of_budget()
+        finally:
+            if started:
+                late = self.stop_workers(wcalls, mcses, axps, found)
+
+            self.calls = calls + sum(wcalls.values())
+            self.save_state(mcses, axps, exhausted)
+            self.remember(mcses + seeds)
+
+        # the AXps reported while stopping are kept if needed
+        for hset in late:
+            if len(expls) == self.optns.xnum:
+                break
 
-                    expl = [self.rhypos[i] for i in hset]
-                    expls.append(expl)
+            expls.append([self.rhypos[i] for i in hset])
+            yield expls[-1]
 
-                    if len(expls) != self.optns.xnum:
-                        hitman.block(hset)
-                    else:
+    def stop_workers(self, wcalls, mcses, axps, found):
+        """
+            Stop the workers of the portfolio and wait for them. Returns
+            the new AXps reported in the meantime.
+        """
+
+        for proc, inbox in self.workers:
+            inbox.put(('stop', ))
+
+        late, stopped = [], 0
+        while stopped < len(self.workers):
+            kind, wid, ncalls, hset = self.outbox.get()
+
+            wcalls[wid] = ncalls
+            if kind == 'stopped':
+                stopped += 1
+            elif kind == 'mcs' and hset:
+                mcses.append(hset)
+            elif kind == 'axp' and tuple(sorted(hset)) not in found:
+                found.add(tuple(sorted(hset)))
+                axps.append(hset)
+                late.append(hset)
+
+        return late
+
+    def portfolio_worker(self, wid, inbox, outbox):
+        """
+            A process of the portfolio. Enumerates the AXps of every sample
+            it receives, reporting the MCSes and AXps it finds and taking
+            into account those found by the other processes.
+        """
+
+        self.verbose = 0
+        self.init_oracle()
+
+        while True:
+            _, instance, target, mcses, axps, smallest = inbox.get()
+
+            # the target is not derived again, as it may differ
+            self.prepare(instance, target=target)
+            self.to_consider = [True for h in self.rhypos]
+            self.calls = 0
+
+            # each worker puts the hypotheses in its own order
+            hypos = list(range(len(self.rhypos)))
+            shift = wid * len(hypos) // self.optns.xjobs
+
+            with Hitman(bootstrap_with=[hypos[shift:] + hypos[:shift]], htype='sorted' if smallest else 'lbx') as hitman:
+                for mcs in mcses:
+                    hitman.hit(mcs)
+
+                for axp in axps:
+                    hitman.block(axp)
+
+                stopped = False
+                while not stopped:
+                    # what the other workers have found so far
+                    try:
+                        while True:
+                            msg = inbox.get_nowait()
+                            if msg[0] == 'hit':
+                                hitman.hit(msg[1])
+                            elif msg[0] == 'block':
+                                hitman.block(msg[1])
+                            else:
+                                stopped = True
+                    except queue.Empty:
+                        pass
+
+                    if stopped:
                         break
 
-        return expls
+                    hset = hitman.get()
+
+                    if hset == None:
+                        outbox.put(('done', wid, self.calls, None))
+
+                        # waiting to be stopped
+                        while inbox.get()[0] != 'stop':
+                            pass
+                        break
+
+                    self.calls += 1
+                    if self.oracle.solve([self.selv] + [self.rhypos[i] for i in hset]):
+                        to_hit = self.compute_mcs(hset)
+                        hitman.hit(to_hit)
+                        outbox.put(('mcs', wid, self.calls, to_hit))
+                    else:
+                        hitman.block(hset)
+                        outbox.put(('axp', wid, self.calls, hset))
+
+            outbox.put(('stopped', wid, self.calls, None))
 
     def enumerate_smallest_contrastive(self):
         """
@@ -591,11 +1191,12 @@ class SMTExplainer(object):
 
     def enumerate_contrastive(self, smallest=True):
         """
-            Compute a cardinality-minimal contrastive explanation.
+            Enumerate cardinality- (or subset-) minimal contrastive
+            explanations, yielding each of them as soon as it is found.
         """
 
         # core extraction is done via calling Z3's internal API
-        assert self.optns.solver == 'z3', 'This procedure requires Z3'
+        assert self.optns.solver in ('z3', 'z3native'), 'This procedure requires Z3'
 
         # result
         expls = []
@@ -606,23 +1207,6 @@ class SMTExplainer(object):
         # mapping from hypothesis variables to their indices
         hmap = {h: i for i, h in enumerate(self.rhypos)}
 
-        # mapping from internal Z3 variable into variables of PySMT
-        vmap = {self.oracle.converter.convert(v): v for v in self.rhypos}
-        vmap[self.oracle.converter.convert(self.selv)] = None
-
-        def _get_core():
-            core = self.oracle.z3.unsat_core()
-            return sorted(filter(lambda x: x != None, map(lambda x: vmap[x], core)), key=lambda x: int(x.symbol_name()[6:]))
-
-        def _do_trimming(core):
-            for i in range(self.optns.trim):
-                self.calls += 1
-                self.oracle.solve([self.selv] + core)
-                new_core = _get_core()
-                if len(core) == len(new_core):
-                    break
-            return new_core
-
         def _reduce_lin(core):
             def _assump_needed(a):
                 if len(to_test) > 1:
@@ -680,11 +1264,15 @@ class SMTExplainer(object):
                         # this is a unit-size MCS => block immediately
                         hitman.block([i])
                         expls.append([self.rhypos[i]])
+                        yield expls[-1]
 
             # main loop
             iters = 0
             while True:
-                hset = hitman.get()
+                if self.out_of_budget():
+                    break
+
+                hset = self.stats.get(hitman)
                 iters += 1
 
                 if self.verbose > 1:
@@ -696,13 +1284,15 @@ class SMTExplainer(object):
 
                 self.calls += 1
                 if not self.oracle.solve([self.selv] + [self.rhypos[h] for h in list(set(range(len(self.rhypos))).difference(set(hset)))]):
-                    to_hit = _get_core()
+                    to_hit = self.get_core()
 
+                    mark = self.stats.mark()
                     if len(to_hit) > 1 and self.optns.trim:
-                        to_hit = _do_trimming(to_hit)
+                        to_hit = self.trim_core(to_hit)
 
                     if len(to_hit) > 1 and self.optns.reduce != 'none':
                         to_hit = _reduce_coex(to_hit)
+                    self.stats.reduced(mark)
 
                     self.dualx.append(to_hit)
                     to_hit = [hmap[h] for h in to_hit]
@@ -718,13 +1308,13 @@ class SMTExplainer(object):
                     expl = [self.rhypos[i] for i in hset]
                     expls.append(expl)
 
+                    yield expl
+
                     if len(expls) != self.optns.xnum:
                         hitman.block(hset)
                     else:
                         break
 
-        return expls
-
 
 #
 #==============================================================================
@@ -753,6 +1343,9 @@ class MXExplainer(object):
 
         self.verbose = self.optns.verb
 
+        # profile of the current instance
+        self.stats = OracleStats()
+
         # MaxSAT-based oracles
         self.oracles = {}
         if self.optns.encode == 'mxa':
@@ -761,12 +1354,27 @@ class MXExplainer(object):
             ortype = 'ext'
         else:
             ortype = 'int'
-        for clid in range(nof_classes):
-            self.oracles[clid] = MXReasoner(formula, clid,
-                    solver=self.optns.solver,
-                    oracle=ortype,
-                    am1=self.optns.am1, exhaust=self.optns.exhaust,
-                    minz=self.optns.minz, trim=self.optns.trim)
+
+        # unit cores kept across runs
+        coredb = None
+        if self.optns.coredb and ortype == 'int':
+            from .xcache import CoreStore
+            coredb = CoreStore(self.optns.coredb, self.optns)
+
+        # options shared by all the reasoners
+        self.mxopts = {'solver': self.optns.solver, 'oracle': ortype,
+                'am1': self.optns.am1, 'exhaust': self.optns.exhaust,
+                'minz': self.optns.minz, 'trim': self.optns.trim,
+                'stats': self.stats, 'race': self.optns.race,
+                'coredb': coredb, 'persist': self.optns.persist}
+
+        if self.optns.attack:
+            # one oracle per label of the attack layer
+            self.encode_attacker(formula)
+        else:
+            for clid in range(nof_classes):
+                self.oracles[clid] = TimedOracle(MXReasoner(formula, clid,
+                        **self.mxopts), self.stats, method='get_coex')
 
         # a reference to the current oracle
         self.oracle = None
@@ -776,6 +1384,11 @@ class MXExplainer(object):
         for clid in range(nof_classes):
             self.poracle.append_formula(formula[clid].formula)
 
+        # vectorized predictor, if the paths of the leaves are known
+        self.lwghts = None
+        if self.xgb.mxe.leafpaths:
+            self.init_evaluator()
+
         # determining which features should go hand in hand
         categories = collections.defaultdict(lambda: [])
         for f in self.xgb.extended_feature_names_as_array_strings:
@@ -803,6 +1416,56 @@ class MXExplainer(object):
         # number of oracle calls involved
         self.calls = 0
 
+        # there are no budgets, the explanations are always complete
+        self.complete = True
+
+    def encode_attacker(self, formula):
+        """
+            Create the oracles of the labels of the attack layer. The biased
+            rules label the samples predicted in distribution and the
+            unbiased ones the samples predicted out of distribution. The
+            rules are compiled into hard clauses over the interval
+            variables: a label is entailed unless the model can predict a
+            class none of whose rules with this label apply.
+        """
+
+        assert self.nofcl == 2, 'The attack layer expects a binary model'
+
+        # compas, german data: ood => output=0 otherwise =1 (in dist)
+        ood_id = self.xgb.target_name.index(0)
+
+        biased, unbiased = self.xgb.mxe.attack_layer()
+        self.adv_rules = {1 - ood_id: biased, ood_id: unbiased}
+        self.adv_targets = sorted(set([label for label, lits in biased + unbiased]))
+
+        for i, label in enumerate(self.adv_targets):
+            reasoners = []
+
+            for clid in sorted(self.adv_rules):
+                # none of the rules of the class with this label applies
+                layer = [[-l for l in lits] for lb, lits in self.adv_rules[clid] if lb == label]
+
+                # a rule with no tests always applies
+                if [] not in layer:
+                    reasoners.append(MXReasoner(formula, 1 - clid,
+                        layer={clid: layer}, **self.mxopts))
+
+            self.oracles[i] = TimedOracle(AttackReasoner(reasoners),
+                    self.stats, method='get_coex')
+
+    def attack_label(self, clid):
+        """
+            Index of the label given by the attack layer to the sample whose
+            class was just predicted, i.e. the label of the first rule of the
+            class whose tests hold.
+        """
+
+        for label, lits in self.adv_rules[clid]:
+            if all([self.values[abs(l)] == (l > 0) for l in lits]):
+                return self.adv_targets.index(label)
+
+        assert 0, 'No rule of the attack layer applies'
+
     def __del__(self):
         """
             Destructor.
@@ -828,9 +1491,96 @@ class MXExplainer(object):
             self.poracle.delete()
             self.poracle = None
 
+    def init_evaluator(self):
+        """
+            Arrays evaluating the trees on a complete instance at once: the
+            input variables (order variables hold if the interval of the
+            feature is not later than theirs, interval variables if it is
+            the same), the literals of the paths of the leaves and the
+            leaves of the classes with their weights.
+        """
+
+        mxe = self.xgb.mxe
+
+        # interval of each assumption literal
+        self.lit2intv = {}
+
+        evars, efeats, eintvs, eorder = [], [], [], []
+        for j, f in enumerate(mxe.ivars):
+            for i, v in enumerate(mxe.ivars[f]):
+                self.lit2intv[v] = (j, i)
+
+            for i in range(len(mxe.ivars[f]) - 1):
+                evars.append(mxe.lvars[f][i])
+                efeats.append(j)
+                eintvs.append(i)
+                eorder.append(True)
+
+                if i > 0:
+                    evars.append(mxe.ivars[f][i])
+                    efeats.append(j)
+                    eintvs.append(i)
+                    eorder.append(False)
+
+        self.evars, self.efeats = np.array(evars), np.array(efeats)
+        self.eintvs, self.eorder = np.array(eintvs), np.array(eorder)
+        self.nofeats = len(mxe.ivars)
+
+        # literals of the paths, with the leaves they belong to
+        leaves = {leaf: i for i, leaf in enumerate(mxe.leafpaths)}
+        plits, pleaves = [], []
+        for leaf, prefix in mxe.leafpaths.items():
+            plits.extend(prefix)
+            pleaves.extend([leaves[leaf]] * len(prefix))
+
+        self.plits, self.pleaves = np.array(plits, dtype=int), np.array(pleaves, dtype=int)
+        self.nofleaves = len(leaves)
+
+        # leaves of the classes
+        lleaves, lclass, lwghts = [], [], []
+        for clid in range(self.nofcl):
+            for lit, wght in mxe.enc[clid].leaves:
+                lleaves.append(leaves[lit])
+                lclass.append(clid)
+                lwghts.append(float(wght))
+
+        self.lleaves, self.lclass = np.array(lleaves), np.array(lclass)
+        self.lwghts = np.array(lwghts)
+
+        self.nofvars = max([mxe.enc[clid].formula.nv for clid in range(self.nofcl)])
+
+    def evaluate(self):
+        """
+            Values of the input variables and the class scores for the
+            current assumption literals (see init_evaluator()).
+        """
+
+        intvs = np.zeros(self.nofeats, dtype=int)
+        for lit in self.hypos:
+            j, i = self.lit2intv[lit]
+            intvs[j] = i
+
+        # values of the variables, the 0th being true
+        values = np.zeros(self.nofvars + 1, dtype=bool)
+        values[0] = True
+        values[self.evars] = np.where(self.eorder, self.eintvs >= intvs[self.efeats],
+                self.eintvs == intvs[self.efeats])
+
+        # a leaf is reached if none of the literals of its path is false
+        falsified = values[np.abs(self.plits)] != (self.plits > 0)
+        reached = np.bincount(self.pleaves, weights=falsified, minlength=self.nofleaves) == 0
+
+        scores = np.bincount(self.lclass, weights=self.lwghts * reached[self.lleaves],
+                minlength=self.nofcl)
+
+        return values, scores
+
     def predict(self, sample):
         """
-            Run the encoding and determine the corresponding class.
+            Run the encoding and determine the corresponding class. The trees
+            are evaluated directly (see evaluate()), unless the scores of the
+            best classes are too close to be compared with floats or
+            --check-predict is given; SAT propagation is then used.
         """
 
         # translating sample into assumption literals
@@ -843,11 +1593,23 @@ class MXExplainer(object):
             for v in range(cat[0], cat[1] + 1):
                 self.v2cat[self.hypos[v]] = i
 
+        if self.lwghts is not None:
+            values, vscores = self.evaluate()
+            best = np.sort(vscores)[-2:]
+
+            if best[1] - best[0] > 1e-9 and not self.optns.check_predict:
+                # the values are also used to apply the attack layer
+                self.values = values
+                return int(np.argmax(vscores))
+
         # running the solver to propagate the prediction;
         # using solve() instead of propagate() to be able to extract a model
         assert self.poracle.solve(assumptions=self.hypos), 'Formula must be satisfiable!'
         model = self.poracle.get_model()
 
+        # the values are also used to apply the attack layer
+        self.values = np.array([True] + [l > 0 for l in model])
+
         # computing all the class scores
         scores = {}
         for clid in range(self.nofcl):
@@ -858,26 +1620,42 @@ class MXExplainer(object):
                 if model[abs(lit) - 1] > 0:
                     scores[clid] += wght
 
-        # returning the class corresponding to the max score
-        return max(list(scores.items()), key=lambda t: t[1])[0]
+        # the class corresponding to the max score
+        clid = max(list(scores.items()), key=lambda t: t[1])[0]
+
+        if self.lwghts is not None and self.optns.check_predict:
+            assert np.allclose(vscores, [float(scores[c]) for c in range(self.nofcl)]), \
+                    'Wrong scores: {0} vs {1}'.format(list(vscores), [scores[c] for c in range(self.nofcl)])
+            assert best[1] - best[0] <= 1e-9 or clid == int(np.argmax(vscores)), 'Wrong prediction'
+            assert all([values[v] == self.values[v] for v in self.evars]), 'Wrong input values'
+
+        return clid
 
     def prepare(self, sample):
         """
             Prepare the oracle for computing an explanation.
         """
 
+        # starting the profile of this instance
+        self.stats.reset()
+
         # first, we need to determine the prediction, according to the model
         self.out_id = self.predict(sample)
 
+        # correct class id (corresponds to the maximum computed)
+        self.output = self.xgb.target_name[self.out_id]
+
+        # or the label given to it by the attack layer
+        if self.optns.attack:
+            self.out_id = self.attack_label(self.out_id)
+            self.output = self.adv_targets[self.out_id]
+
         # selecting the right oracle
         self.oracle = self.oracles[self.out_id]
 
         # transformed sample
         self.sample = list(self.xgb.transform(sample)[0])
 
-        # correct class id (corresponds to the maximum computed)
-        self.output = self.xgb.target_name[self.out_id]
-
         if self.verbose:
             inpvals = self.xgb.readable_sample(sample)
 
@@ -890,7 +1668,7 @@ class MXExplainer(object):
 
             print('  explaining:  "IF {0} THEN {1}"'.format(' AND '.join(self.preamble), self.output))
 
-    def explain(self, sample, smallest, expl_ext=None, prefer_ext=False):
+    def explain(self, sample, smallest, expl_ext=None, prefer_ext=False, label=None):
         """
             Hypotheses minimization.
         """
@@ -913,6 +1691,9 @@ class MXExplainer(object):
                 xnum=self.optns.xnum, unit_mcs=self.optns.unit_mcs,
                 reduce_=self.optns.reduce)
 
+        # explanations are reported in terms of features, not categories
+        self.expls = [self._cats2fids(expl) for expl in self.expls]
+
         self.time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
                 resource.getrusage(resource.RUSAGE_SELF).ru_utime - self.time
 
@@ -921,10 +1702,8 @@ class MXExplainer(object):
 
         if self.verbose:
             for expl in self.expls:
-                hyps = list(reduce(lambda x, y: x + self.hypos[y[0]:y[1]+1], [self.fcats[c] for c in expl], []))
-                expl = sorted(set(map(lambda v: self.v2feat[v], hyps)))
                 preamble = [self.preamble[i] for i in expl]
-                label = self.xgb.target_name[self.out_id]
+                label = self.output
 
                 if self.optns.xtype in ('contrastive', 'con'):
                     preamble = [l.replace('==', '!=') for l in preamble]
@@ -938,23 +1717,55 @@ class MXExplainer(object):
 
         return self.expls
 
+    def iter_explanations(self, sample, smallest, label=None):
+        """
+            Explanations of a sample yielded one by one, as soon as they
+            are found. The caller can stop at any point.
+        """
+
+        self.prepare(sample)
+
+        if self.optns.encode != 'mxe':
+            # dummy call with the full instance to detect all the necessary cores
+            self.oracle.get_coex(self.hypos, full_instance=True, early_stop=True)
+
+        for expl in self._enumerate(sample, smallest=smallest, xtype=self.optns.xtype,
+                xnum=self.optns.xnum, unit_mcs=self.optns.unit_mcs,
+                reduce_=self.optns.reduce):
+            yield self._cats2fids(expl)
+
     def _explain(self, sample, smallest=True, xtype='abd', xnum=1,
             unit_mcs=False, reduce_='none'):
         """
             Compute an explanation.
         """
 
+        for expl in self._enumerate(sample, smallest, xtype, xnum, unit_mcs, reduce_):
+            pass
+
+    def _enumerate(self, sample, smallest=True, xtype='abd', xnum=1,
+            unit_mcs=False, reduce_='none'):
+        """
+            Compute explanations, yielding each of them once found. All of
+            them are collected in self.expls.
+        """
+
         if xtype in ('abductive', 'abd'):
-            # abductive explanations => MUS computation and enumeration
-            if not smallest and xnum == 1:
+            # abductive explanations => MUS computation and enumeration;
+            # with --xstate, a single AXp is enumerated to record the state
+            if not smallest and xnum == 1 and not self.optns.xstate:
                 self.expls = [self.extract_mus(reduce_=reduce_)]
+                yield self.expls[0]
             else:
-                self.mhs_mus_enumeration(xnum, smallest=smallest)
+                for expl in self.mhs_mus_enumeration(xnum, smallest=smallest):
+                    yield expl
         else:  # contrastive explanations => MCS enumeration
             if xnum == 1:
                 self.expls = [self.extract_mcs()]
+                yield self.expls[0]
             else:
-                self.mhs_mcs_enumeration(xnum, smallest, reduce_)
+                for expl in self.mhs_mcs_enumeration(xnum, smallest, reduce_):
+                    yield expl
 
     def extract_mus(self, reduce_='lin', start_from=None):
         """
@@ -1015,6 +1826,7 @@ class MXExplainer(object):
 
             # getting the core
             core = self.oracle.get_reason(self.v2cat)
+            self.stats.core(core)
         else:
             core = start_from
 
@@ -1032,79 +1844,140 @@ class MXExplainer(object):
 
     def mhs_mus_enumeration(self, xnum, smallest=False):
         """
-            Enumerate subset- and cardinality-minimal explanations.
+            Enumerate subset- and cardinality-minimal explanations. Each of
+            them is yielded as soon as it is found (and added to self.expls).
         """
 
+        # MCSes and AXps found so far (by an earlier run, if any)
+        mcses, axps, exhausted = self.load_state()
+
         # result
-        self.expls = []
+        self.expls = axps[:xnum] if xnum > 0 else axps[:]
 
         # just in case, let's save dual (contrastive) explanations
-        self.duals = []
+        self.duals = mcses[:]
+
+        for expl in self.expls:
+            yield expl
 
         with Hitman(bootstrap_with=[self.allcats], htype='sorted' if smallest else 'lbx') as hitman:
-            # computing unit-size MCSes
-            if self.optns.unit_mcs:
-                for c in self.allcats:
-                    self.calls += 1
-                    if self.oracle.get_coex(self._cats2hypos(self.allcats[:c] + self.allcats[(c + 1):]), early_stop=True):
-                        hitman.hit([c])
-                        self.duals.append([c])
+            for mcs in mcses:
+                hitman.hit(mcs)
 
-            # main loop
+            for axp in axps:
+                hitman.block(axp)
+
+            # main loop (the state is saved even if the caller stops early)
             iters = 0
-            while True:
-                hset = hitman.get()
-                iters += 1
+            try:
+                while not exhausted and len(self.expls) != xnum:
+                    hset = self.stats.get(hitman)
+                    iters += 1
 
-                if self.verbose > 2:
-                    print('iter:', iters)
-                    print('cand:', hset)
+                    if self.verbose > 2:
+                        print('iter:', iters)
+                        print('cand:', hset)
 
-                if hset == None:
-                    break
+                    if hset == None:
+                        exhausted = True
+                        break
 
-                self.calls += 1
-                hypos = self._cats2hypos(hset)
-                coex = self.oracle.get_coex(hypos, early_stop=True)
-                if coex:
-                    to_hit = []
-                    satisfied, unsatisfied = [], []
+                    self.calls += 1
+                    hypos = self._cats2hypos(hset)
+                    coex = self.oracle.get_coex(hypos, early_stop=True)
+                    if coex:
+                        mark = self.stats.mark()
+                        to_hit = []
+                        satisfied, unsatisfied = [], []
+
+                        removed = list(set(self.hypos).difference(set(hypos)))
+
+                        for h in removed:
+                            if coex[abs(h) - 1] != h:
+                                unsatisfied.append(self.v2cat[h])
+                            else:
+                                hset.append(self.v2cat[h])
 
-                    removed = list(set(self.hypos).difference(set(hypos)))
+                        unsatisfied = list(set(unsatisfied))
+                        hset = list(set(hset))
 
-                    for h in removed:
-                        if coex[abs(h) - 1] != h:
-                            unsatisfied.append(self.v2cat[h])
-                        else:
-                            hset.append(self.v2cat[h])
+                        # computing an MCS (expensive)
+                        for h in unsatisfied:
+                            self.calls += 1
+                            if self.oracle.get_coex(self._cats2hypos(hset + [h]), early_stop=True):
+                                hset.append(h)
+                            else:
+                                to_hit.append(h)
+
+                        self.stats.reduced(mark)
+
+                        if self.verbose > 2:
+                            print('coex:', to_hit)
+
+                        hitman.hit(to_hit)
+
+                        self.duals.append(to_hit)
+                        mcses.append(to_hit)
+                    else:
+                        if self.verbose > 2:
+                            print('expl:', hset)
 
-                    unsatisfied = list(set(unsatisfied))
-                    hset = list(set(hset))
+                        self.expls.append(hset)
+                        axps.append(hset)
 
-                    # computing an MCS (expensive)
-                    for h in unsatisfied:
-                        self.calls += 1
-                        if self.oracle.get_coex(self._cats2hypos(hset + [h]), early_stop=True):
-                            hset.append(h)
+                        yield hset
+
+                        if len(self.expls) != xnum:
+                            hitman.block(hset)
                         else:
-                            to_hit.append(h)
+                            break
+            finally:
+                self.save_state(mcses, axps, exhausted)
 
-                    if self.verbose > 2:
-                        print('coex:', to_hit)
+    def unit_mcses(self):
+        """
+            Detect the unit-size MCSes, i.e. the categories whose removal
+            alone breaks the entailment.
+        """
 
-                    hitman.hit(to_hit)
+        for c in self.allcats:
+            self.calls += 1
+            if self.oracle.get_coex(self._cats2hypos(self.allcats[:c] + self.allcats[(c + 1):]), early_stop=True):
+                yield c
 
-                    self.duals.append([to_hit])
-                else:
-                    if self.verbose > 2:
-                        print('expl:', hset)
+    def load_state(self):
+        """
+            MCSes and AXps (as lists of categories) known for the current
+            sample and whether these are all its AXps. With --xstate, they
+            come from the earlier runs that enumerated the sample (if any);
+            otherwise, the unit-size MCSes are computed if requested.
+        """
 
-                    self.expls.append(hset)
+        if self.optns.xstate:
+            if 'xstore' not in dir(self):
+                from .xcache import EnumerationStore
+                self.xstore = EnumerationStore(self.optns.xstate, self.optns)
 
-                    if len(self.expls) != xnum:
-                        hitman.block(hset)
-                    else:
-                        break
+            state = self.xstore.load(self.sample)
+
+            # categories are meaningless if the hypotheses differ
+            if state and state['hypos'] == self.hypos:
+                return state['mcses'], state['axps'], state['done']
+
+        if self.optns.unit_mcs:
+            return [[c] for c in self.unit_mcses()], [], False
+
+        return [], [], False
+
+    def save_state(self, mcses, axps, exhausted):
+        """
+            Record the MCSes and AXps known for the current sample, so that
+            a later run can resume the enumeration (see --xstate).
+        """
+
+        if self.optns.xstate:
+            self.xstore.save(self.sample, {'hypos': self.hypos,
+                'mcses': mcses, 'axps': axps, 'done': exhausted})
 
     def extract_mcs(self,start_from=None):
         """
@@ -1128,8 +2001,7 @@ class MXExplainer(object):
                 
         # compute an over approx        
         # setting preferred polarities
-        for clid in self.oracle.oracles:
-            self.oracle.oracles[clid].oracle.set_phases(self._cats2hypos(core)) 
+        self.oracle.set_phases(self._cats2hypos(core))
                 
         model = self.oracle.get_coex([], early_stop=True)
         assert (model)
@@ -1162,6 +2034,8 @@ class MXExplainer(object):
     def mhs_mcs_enumeration(self, xnum, smallest=False, reduce_='none', unit_mcs=False):
         """
             Enumerate subset- and cardinality-minimal contrastive explanations.
+            Each of them is yielded as soon as it is found (and added to
+            self.expls).
         """
 
         # result
@@ -1184,10 +2058,12 @@ class MXExplainer(object):
                     hitman.block([c])
                     self.expls.append([c])
 
+                    yield [c]
+
             # main loop
             iters = 0
             while True:
-                hset = hitman.get()
+                hset = self.stats.get(hitman)
                 iters += 1
 
                 if self.verbose > 2:
@@ -1200,9 +2076,12 @@ class MXExplainer(object):
                 self.calls += 1
                 if not self.oracle.get_coex(self._cats2hypos(set(self.allcats).difference(set(hset))), early_stop=True):
                     to_hit = self.oracle.get_reason(self.v2cat)
+                    self.stats.core(to_hit)
 
                     if len(to_hit) > 1 and reduce_ != 'none':
+                        mark = self.stats.mark()
                         to_hit = self.extract_mus(reduce_=reduce_, start_from=to_hit)
+                        self.stats.reduced(mark)
 
                     self.duals.append(to_hit)
 
@@ -1216,6 +2095,8 @@ class MXExplainer(object):
 
                     self.expls.append(hset)
 
+                    yield hset
+
                     if len(self.expls) != xnum:
                         hitman.block(hset)
                     else:
@@ -1229,6 +2110,13 @@ class MXExplainer(object):
         return list(reduce(lambda x, y: x + self.hypos[y[0] : y[1] + 1],
             [self.fcats[c] for c in scats], []))
 
+    def _cats2fids(self, scats):
+        """
+            Translate selected categories into (sorted) original feature ids.
+        """
+
+        return sorted(set([self.v2feat[h] for h in self._cats2hypos(scats)]))
+
     def _hypos2cats(self, hypos):
         """
             Translate propositional hypotheses into a list of categories.
@@ -15,13 +15,17 @@ import collections
 import copy
 import decimal
 from functools import reduce
-# from .erc2 import ERC2
+import hashlib
 import math
+import multiprocessing
+import os
 from pysat.examples.rc2 import RC2Stratified
 from pysat.formula import CNF, WCNF, IDPool
+from six.moves import queue
 import subprocess
 import sys
 import tempfile
+import threading
 
 
 # a named tuple for class encodings
@@ -40,7 +44,8 @@ class MXReasoner:
     """
 
     def __init__(self, encoding, target, solver='g3', oracle='int',
-            am1=False, exhaust=False, minz=False, trim=0):
+            am1=False, exhaust=False, minz=False, trim=0, stats=None,
+            race=False, coredb=None, persist=False, layer=None):
         """
             Magic initialiser.
         """
@@ -60,9 +65,33 @@ class MXReasoner:
         self.trim = trim
         self.solver = solver  # keeping for alien solvers
 
+        # profile of the explainer (see OracleStats), if any
+        self.stats = stats
+
+        # persistent store of the unit cores of ERC2 (see CoreStore), if any
+        self.coredb = coredb
+
+        # extra hard clauses of the classes, e.g. the rules of the attack
+        # layer (see AttackReasoner), if any
+        self.layer = layer if layer else {}
+
+        # processes racing the MaxSAT oracles of the classes, started
+        # by the first call; binary models have a single oracle, and
+        # daemonic processes (e.g. of --jobs) cannot have any
+        self.racers = {}
+        self.callid = 0
+
+        # alien solver processes kept alive between the calls, one per
+        # class, with the files their formulas are read from (see --persist)
+        self.persist = persist and self.ortype == 'alien'
+        self.aliens = {}
+
         # doing actual initialisation
         self.init(encoding, target, solver)
 
+        self.race = race and self.ortype == 'int' and len(self.oracles) > 1 \
+                and not multiprocessing.current_process().daemon
+
     def __del__(self):
         """
             Magic destructor.
@@ -111,14 +140,34 @@ class MXReasoner:
                 for cl in encoding[self.target].formula:
                     self.formulas[clid].append(cl)
 
+            # adding the extra layer, if any
+            for cl in self.layer.get(clid, []):
+                self.formulas[clid].append(cl)
+
             # adding soft clauses and recording all the leaf values
             self.init_soft(encoding, clid)
 
             if self.ortype == 'int':
-                # a new MaxSAT solver
+                # a new MaxSAT solver; ERC2 (and namedlist)
+                # is imported only if an internal oracle is used
+                from .erc2 import ERC2
                 self.oracles[clid] = ERC2(self.formulas[clid], solver=solver,
                         adapt=self.am1, blo='cluster', exhaust=self.exhaust,
-                        minz=self.minz, verbose=0)
+                        minz=self.minz, verbose=0, coredb=self.coredb,
+                        dbname=self.get_dbname(clid))
+
+    def get_dbname(self, clid):
+        """
+            Name of the unit cores of an oracle in the core store; oracles
+            with different extra layers get different names.
+        """
+
+        name = '{0}-{1}'.format(self.target, clid)
+
+        if clid in self.layer:
+            name += '-' + hashlib.sha1(repr(self.layer[clid]).encode('utf-8')).hexdigest()[:12]
+
+        return name
 
     def init_soft(self, encoding, clid):
         """
@@ -250,6 +299,21 @@ class MXReasoner:
             Actual destructor.
         """
 
+        if self.racers:
+            for proc, inbox in self.racers.values():
+                inbox.put(('stop', ))
+                proc.join()
+
+            self.racers = {}
+
+        if self.aliens:
+            for proc, fname in self.aliens.values():
+                proc.stdin.close()
+                proc.wait()
+                os.remove(fname)
+
+            self.aliens = {}
+
         if self.oracles:
             for oracle in self.oracles.values():
                 if oracle:
@@ -281,16 +345,23 @@ class MXReasoner:
         # updating the reason
         self.reason = set()
 
-        if self.ortype == 'int':
+        if self.race:
+            # the internal MaxSAT solvers are called in parallel
+            return self.race_coex(feats, full_instance, early_stop)
+        elif self.ortype == 'int':
             # using internal MaxSAT solver incrementally
             for clid in self.oracles:
                 if clid == self.target:
                     continue
 
                 model = self.oracles[clid].compute(feats, full_instance, early_stop)
-                assert model or (early_stop and self.oracles[clid].cost > self.oracles[clid].slack), \
+                assert model or self.oracles[clid].infeasible or \
+                        (early_stop and self.oracles[clid].cost > self.oracles[clid].slack), \
                         'Something is wrong, there is no MaxSAT model'
 
+                if self.stats:
+                    self.stats.reused += self.oracles[clid].reused
+
                 # if misclassification, return the model
                 # note that this model is not guaranteed
                 # to represent the predicted class!
@@ -321,6 +392,8 @@ class MXReasoner:
                             rc2.add_clause([lit])
 
                         model = rc2.compute()
+                elif self.persist:  # alien solver kept alive
+                    model = self.call_alien(clid, feats)
                 else:  # expecting 'alien' here
                     # dumping the formula into a temporary file
                     with tempfile.NamedTemporaryFile(suffix='.wcnf') as fp:
@@ -334,22 +407,196 @@ class MXReasoner:
                         outp = outp.decode(encoding='ascii').split('\n')
 
                     # going backwards in the log and extracting the model
+                    model = None
                     for line in range(len(outp) - 1, -1, -1):
                         line = outp[line]
                         if line.startswith('v '):
                             model = [int(l) for l in line[2:].split()]
 
-                assert model, 'Something is wrong, there is no MaxSAT model'
+                    # no model must come with a proof of unsatisfiability
+                    if model is None and not any([l.startswith('s UNSATISFIABLE') for l in outp]):
+                        raise RuntimeError('Alien solver of class {0} failed to solve the formula'.format(clid))
+
+                # the hard part may be unsatisfiable only with an extra layer
+                assert model or clid in self.layer, 'Something is wrong, there is no MaxSAT model'
 
                 # if misclassification, return the model
                 # note that this model is not guaranteed
                 # to represent the predicted class!
-                if self.get_winner(model, clid) != self.target:
+                if model and self.get_winner(model, clid) != self.target:
                     return model
 
             # otherwise, proceed to another clid
             self.reason = set(feats)
 
+    def call_alien(self, clid, feats):
+        """
+            A call to the alien solver of class clid kept alive between the
+            calls (see --persist). The solver is started by the first call,
+            with the file of the formula of the class as its last argument.
+            The feature values of each call are then written to its standard
+            input as a line 'a <literals> 0', and it is expected to answer in
+            the format of the MaxSAT evaluations, i.e. with an 's' line and
+            a 'v' line listing the literals of the model.
+        """
+
+        if clid not in self.aliens:
+            # the formula is dumped only once
+            fd, fname = tempfile.mkstemp(suffix='.wcnf')
+            os.close(fd)
+            self.formulas[clid].to_file(fname)
+
+            proc = subprocess.Popen(self.solver.split() + [fname], shell=False,
+                    stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                    universal_newlines=True, bufsize=1)
+            self.aliens[clid] = (proc, fname)
+
+        proc = self.aliens[clid][0]
+        if proc.poll() is not None:
+            raise RuntimeError('Alien solver of class {0} terminated (exit code {1})'.format(clid, proc.returncode))
+
+        proc.stdin.write('a {0} 0\n'.format(' '.join([str(l) for l in feats])))
+        proc.stdin.flush()
+
+        # reading the answer up to the model; only a proven unsatisfiability
+        # means there is no model, any other outcome is an error, as a missing
+        # model would otherwise be taken for the absence of a counterexample
+        while True:
+            line = proc.stdout.readline()
+
+            if not line:
+                raise RuntimeError('Alien solver of class {0} terminated (exit code {1})'.format(clid, proc.wait()))
+            elif line.startswith('s UNSATISFIABLE'):
+                return None
+            elif line.startswith('s UNKNOWN'):
+                raise RuntimeError('Alien solver of class {0} failed to solve the formula'.format(clid))
+            elif line.startswith('v '):
+                return [int(l) for l in line[2:].split()]
+
+    def race_coex(self, feats, full_instance, early_stop):
+        """
+            The calls of get_coex() to the internal MaxSAT solvers made in
+            parallel, by one process per class (see --race). The first
+            counterexample wins and the other calls are cancelled. If there
+            is no counterexample, the reason is collected from all the
+            solvers, as in the sequential case. Note that the winner may
+            differ from the sequential case, where the classes are tried
+            in order.
+        """
+
+        if not self.racers:
+            # each process owns (a forked copy of) the solver of its class
+            ctx = multiprocessing.get_context('fork')
+            self.finish = ctx.Queue()
+
+            for clid in self.oracles:
+                inbox = ctx.Queue()
+                proc = ctx.Process(target=self.race_worker, args=(clid, inbox, self.finish))
+                proc.daemon = True
+                proc.start()
+                self.racers[clid] = (proc, inbox)
+
+        self.callid += 1
+        for proc, inbox in self.racers.values():
+            inbox.put(('compute', self.callid, feats, full_instance, early_stop))
+
+        pending = set(self.racers.keys())
+        while pending:
+            callid, clid, model, valid, reason, reused = self.finish.get()
+
+            # the results of cancelled calls come late
+            if callid != self.callid:
+                continue
+
+            pending.remove(clid)
+
+            assert valid, 'Something is wrong, there is no MaxSAT model'
+
+            if self.stats:
+                self.stats.reused += reused
+
+            # if misclassification, return the model
+            # and cancel the calls still in progress
+            if model and self.get_winner(model, clid) != self.target:
+                for c in pending:
+                    self.racers[c][1].put(('cancel', self.callid))
+
+                return model
+
+            self.reason = self.reason.union(set(reason))
+
+        if not self.reason:
+            self.reason = None
+
+    def race_worker(self, clid, inbox, outbox):
+        """
+            A process of the race, making the calls to the MaxSAT solver of
+            class clid it receives. The messages are received by a separate
+            thread, so that the call in progress can be cancelled.
+        """
+
+        oracle = self.oracles[clid]
+        oracle.make_cancellable()
+
+        # calls to make and the id of the current one
+        calls, current = queue.Queue(), [None]
+
+        def _receive():
+            while True:
+                msg = inbox.get()
+
+                if msg[0] == 'cancel':
+                    with oracle.cancel_lock:
+                        if current[0] == msg[1]:
+                            oracle.cancel()
+                else:
+                    calls.put(msg)
+
+                    if msg[0] == 'stop':
+                        break
+
+        receiver = threading.Thread(target=_receive)
+        receiver.daemon = True
+        receiver.start()
+
+        while True:
+            msg = calls.get()
+
+            if msg[0] == 'stop':
+                break
+            elif msg[0] == 'phases':
+                oracle.oracle.set_phases(msg[1])
+                continue
+
+            _, callid, feats, full_instance, early_stop = msg
+
+            with oracle.cancel_lock:
+                current[0] = callid
+                oracle.cancelled = False
+
+            model = oracle.compute(feats, full_instance, early_stop)
+
+            with oracle.cancel_lock:
+                current[0] = None
+                cancelled = oracle.cancelled
+
+            # the result of a cancelled call is not needed
+            if not cancelled:
+                valid = model or oracle.infeasible or (early_stop and oracle.cost > oracle.slack)
+                outbox.put((callid, clid, model, bool(valid), oracle.get_reason(), oracle.reused))
+
+    def set_phases(self, literals):
+        """
+            Set the preferred polarities of the SAT solvers of the internal
+            MaxSAT solvers.
+        """
+
+        for clid in self.oracles:
+            if clid in self.racers:
+                self.racers[clid][1].put(('phases', literals))
+            else:
+                self.oracles[clid].oracle.set_phases(literals)
+
     def get_winner(self, model, clid):
         """
             Check the values for each class and extract the prediction.
@@ -392,3 +639,84 @@ class MXReasoner:
             return sorted(set(v2fmap[v] for v in self.reason))
         else:
             return self.reason
+
+
+#
+#==============================================================================
+class AttackReasoner(object):
+    """
+        Explanation oracle for the labels of the attack layer (see --attack).
+        The layer labels a prediction by the rules of the predicted class,
+        so a set of feature values entails a label unless the model can
+        predict some class none of whose rules with this label apply. Each
+        such class is checked by an MXReasoner whose formula has the rules
+        as extra hard clauses. Counterexamples and reasons are given as by
+        MXReasoner.
+    """
+
+    def __init__(self, reasoners):
+        """
+            Initialiser.
+        """
+
+        self.reasoners = reasoners
+        self.reason = None
+
+    def __del__(self):
+        """
+            Destructor.
+        """
+
+        self.delete()
+
+    def delete(self):
+        """
+            Actual destructor.
+        """
+
+        if self.reasoners:
+            for oracle in self.reasoners:
+                oracle.delete()
+
+            self.reasoners = []
+
+    def get_coex(self, feats, full_instance=False, early_stop=False):
+        """
+            A call to the oracles of the classes, returning the first
+            counterexample found, if any.
+        """
+
+        self.reason = set()
+
+        for oracle in self.reasoners:
+            model = oracle.get_coex(feats, full_instance, early_stop)
+
+            if model:
+                return model
+
+            # a class may be ruled out with no feature values at all
+            if oracle.reason:
+                self.reason = self.reason.union(set(oracle.reason))
+
+        if not self.reason:
+            self.reason = None
+
+    def set_phases(self, literals):
+        """
+            Set the preferred polarities of all the oracles.
+        """
+
+        for oracle in self.reasoners:
+            oracle.set_phases(literals)
+
+    def get_reason(self, v2fmap=None):
+        """
+            Reports the last reason, as MXReasoner.get_reason().
+        """
+
+        assert self.reason, 'There no reason to return!'
+
+        if v2fmap:
+            return sorted(set(v2fmap[v] for v in self.reason))
+        else:
+            return self.reason
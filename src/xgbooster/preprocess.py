@@ -12,7 +12,6 @@
 #==============================================================================
 import json
 import numpy as np
-import xgboost as xgb
 import math
 import pandas as pd
 import numpy as np
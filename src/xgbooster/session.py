@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## session.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from __future__ import print_function
+import numpy as np
+import resource
+from .xgbooster import XGBooster
+
+
+#
+#==============================================================================
+class ExplainSession(object):
+    """
+        A long-lived explanation session. The model, its encoding and the
+        explainer are created once and then serve many explanation calls.
+    """
+
+    def __init__(self, options, from_model, categorical_features=None):
+        """
+            Constructor.
+        """
+
+        self.options = options
+
+        # the model (and its split data) is unpickled only once
+        self.xgb = XGBooster(options, from_model=from_model,
+                categorical_features=categorical_features)
+
+        # extra information on the last explained point
+        self.info = {}
+
+    def explain(self, point, use_lime=None, use_anchor=None, use_shap=None,
+            nof_feats=5):
+        """
+            Explain the prediction for a given point. Returns the explanation,
+            the prediction and the time spent.
+        """
+
+        point_ = [round(float(x), 2) for x in point]
+
+        if self.options.explain:
+            self.options.explain = point_
+
+        # the encoding is built (and tested on the first point) only once;
+        # the explainer is then created lazily by XGBooster.explain()
+        if self.options.encode and 'enc' not in dir(self.xgb):
+            self.xgb.encode(test_on=point_)
+
+        feat_sample_exp = np.expand_dims(point_, axis=0)
+        feat_sample_tr = self.xgb.transform(feat_sample_exp)
+
+        if self.options.attack:
+            y_pred = self.xgb.predict(feat_sample_exp)[0]
+        else:
+            y_pred = self.xgb.model.predict(feat_sample_tr)[0]
+
+        time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
+                resource.getrusage(resource.RUSAGE_SELF).ru_utime
+
+        expl_ = self.xgb.explain(point_, use_lime=use_lime,
+                use_anchor=use_anchor, use_shap=use_shap,
+                nof_feats=nof_feats, attack=self.options.attack)
+
+        time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
+                resource.getrusage(resource.RUSAGE_SELF).ru_utime - time
+
+        if use_lime or use_shap:
+            expl, y_pred = expl_[0], expl_[1]
+        else:
+            expl = expl_
+
+        if (use_lime or use_anchor or use_shap) and self.options.validate:
+            self.xgb.validate(self.options.explain, expl)
+
+        # explanations are incomplete if the explainer ran out of budget
+        self.info = {'complete': self.xgb.x.complete if 'x' in dir(self.xgb) else True}
+
+        # number of oracle calls made by the SMT or MaxSAT explainer
+        # and where their time went (see OracleStats)
+        if 'x' in dir(self.xgb) and not (use_lime or use_anchor or use_shap):
+            self.info['calls'] = self.xgb.x.calls
+            self.info['stats'] = self.xgb.x.stats.report()
+
+        return expl, y_pred, time
+
+    def iter_explanations(self, point):
+        """
+            Explanations of a point computed by the reasoning-based
+            explainer, yielded one by one as soon as they are found.
+        """
+
+        point_ = [round(float(x), 2) for x in point]
+
+        if self.options.encode and 'enc' not in dir(self.xgb):
+            self.xgb.encode(test_on=point_)
+
+        return self.xgb.iter_explanations(point_)
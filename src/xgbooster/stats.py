@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## stats.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+import bisect
+import resource
+import time
+
+
+#
+#==============================================================================
+class OracleStats(object):
+    """
+        Profile of the explanation of one instance: the number and the
+        latencies of the satisfiable and unsatisfiable oracle calls, the
+        time spent by the hitting set enumerator, the sizes of the cores,
+        the cost of reducing counterexamples and cores (into MCSes or
+        AXps), the cores reused by ERC2 and the memory high-water marks.
+    """
+
+    # upper bounds (in seconds) of the buckets of the latency histograms;
+    # the last bucket holds the calls slower than the last bound
+    bounds = [0.0001, 0.001, 0.01, 0.1, 1.0, 10.0]
+
+    def __init__(self):
+        """
+            Constructor.
+        """
+
+        self.reset()
+
+    def reset(self):
+        """
+            Start the profile of a new instance.
+        """
+
+        # oracle calls, by their outcome (True for satisfiable)
+        self.calls = {True: 0, False: 0}
+        self.times = {True: 0.0, False: 0.0}
+        self.hists = {True: [0] * (len(self.bounds) + 1),
+                False: [0] * (len(self.bounds) + 1)}
+
+        # hitting set enumerator
+        self.hcalls, self.htime = 0, 0.0
+
+        # sizes of the cores obtained from the oracle
+        self.cores = []
+
+        # reductions, the oracle calls they made and their time
+        self.reductions, self.rcalls, self.rtime = 0, 0, 0.0
+
+        # cores reused by ERC2
+        self.reused = 0
+
+    def record(self, sat, elapsed):
+        """
+            Take an oracle call into account.
+        """
+
+        self.calls[sat] += 1
+        self.times[sat] += elapsed
+        self.hists[sat][bisect.bisect_left(self.bounds, elapsed)] += 1
+
+    def get(self, hitman):
+        """
+            Next hitting set of a hitting set enumerator.
+        """
+
+        start = time.time()
+        hset = hitman.get()
+
+        self.hcalls += 1
+        self.htime += time.time() - start
+
+        return hset
+
+    def core(self, core):
+        """
+            Take a core into account.
+        """
+
+        self.cores.append(len(core))
+
+    def mark(self):
+        """
+            Starting point of a reduction.
+        """
+
+        return time.time(), self.calls[True] + self.calls[False]
+
+    def reduced(self, mark):
+        """
+            Take a reduction started at a given mark into account.
+        """
+
+        self.reductions += 1
+        self.rcalls += self.calls[True] + self.calls[False] - mark[1]
+        self.rtime += time.time() - mark[0]
+
+    def report(self):
+        """
+            The profile as a dictionary (meant to be dumped as JSON).
+        """
+
+        report = {}
+
+        for sat, name in ((True, 'sat'), (False, 'unsat')):
+            report[name] = {'calls': self.calls[sat],
+                    'time': round(self.times[sat], 6), 'hist': self.hists[sat]}
+
+        report['hist_bounds'] = self.bounds
+        report['hitman'] = {'calls': self.hcalls, 'time': round(self.htime, 6)}
+        report['cores'] = {'count': len(self.cores),
+                'mean': round(float(sum(self.cores)) / len(self.cores), 2) if self.cores else 0,
+                'max': max(self.cores) if self.cores else 0}
+        report['reduce'] = {'count': self.reductions, 'calls': self.rcalls,
+                'time': round(self.rtime, 6)}
+        report['reused_cores'] = self.reused
+
+        # high-water marks (in KB) of this process
+        # and of its children (workers, alien solvers)
+        report['maxrss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report['maxrss_children'] = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+        return report
+
+
+#
+#==============================================================================
+class TimedOracle(object):
+    """
+        An oracle whose calls (made with the given method) are timed and
+        recorded in an OracleStats object. A call is satisfiable if its
+        result is true, i.e. True for solve() of an SMT solver and a
+        counterexample for get_coex() of MXReasoner. Everything else is
+        delegated to the oracle.
+    """
+
+    def __init__(self, oracle, stats, method='solve'):
+        """
+            Constructor.
+        """
+
+        self.oracle_ = oracle
+        self.stats_ = stats
+        self.method_ = method
+
+    def timed(self, *args, **kwargs):
+        """
+            Call the oracle and record the outcome.
+        """
+
+        start = time.time()
+        res = getattr(self.oracle_, self.method_)(*args, **kwargs)
+        self.stats_.record(bool(res), time.time() - start)
+
+        return res
+
+    def __getattr__(self, name):
+        """
+            Attributes of the oracle itself, except for the timed method.
+        """
+
+        if name == self.method_:
+            return self.timed
+
+        return getattr(self.oracle_, name)
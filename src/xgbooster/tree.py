@@ -13,7 +13,6 @@
 from anytree import Node, RenderTree,AsciiStyle
 import json
 import numpy as np
-import xgboost as xgb
 import math
 
 
@@ -44,7 +44,8 @@ class SMTValidator(object):
         self.xgb = xgb
 
         self.verbose = self.optns.verb
-        self.oracle = Solver(name=self.xgb.options.solver)
+        self.oracle = Solver(name='z3' if self.xgb.options.solver == 'z3native' \
+                else self.xgb.options.solver)
 
         self.inps = []  # input (feature value) variables
         for f in self.xgb.extended_feature_names_as_array_strings:
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## xcache.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+import hashlib
+import os
+import pickle
+
+
+#
+#==============================================================================
+class ExplanationCache(object):
+    """
+        Explanations of the instances explained so far, keyed by their
+        interval signature. With an interval-based encoding (smtbool or
+        any of the MaxSAT ones), the model only sees the interval each
+        feature value falls into, so instances with the same signature
+        have exactly the same explanations.
+
+        The cache is kept in memory and, if a directory is given, on disk
+        as well: one file per signature in a subdirectory named after the
+        hash of the model and of the options the explanations depend on.
+        Files are written atomically, so the processes of --jobs (or the
+        workers of a queue) can share a directory.
+    """
+
+    def __init__(self, dirname, options):
+        """
+            Constructor.
+        """
+
+        self.mem = {}
+        self.path = None
+
+        # number of lookups answered by the cache
+        self.hits = 0
+
+        if dirname:
+            self.path = os.path.join(dirname, digest(options, (options.encode,
+                options.xtype, options.xnum, options.smallest, options.use_mhs,
+                options.use_cld)))
+            os.makedirs(self.path, exist_ok=True)
+
+    def fname(self, sig):
+        """
+            File storing the explanations of a signature.
+        """
+
+        return os.path.join(self.path, hashlib.sha1(repr(sig).encode('utf-8')).hexdigest() + '.pkl')
+
+    def get(self, sig):
+        """
+            Explanations of a signature, or None if they are unknown.
+        """
+
+        if sig not in self.mem and self.path and os.path.exists(self.fname(sig)):
+            with open(self.fname(sig), 'rb') as fp:
+                self.mem[sig] = pickle.load(fp)
+
+        if sig in self.mem:
+            self.hits += 1
+            return self.mem[sig]
+
+        return None
+
+    def put(self, sig, expls):
+        """
+            Record the (complete) explanations of a signature.
+        """
+
+        self.mem[sig] = expls
+
+        if self.path:
+            dump(expls, self.fname(sig))
+
+
+#
+#==============================================================================
+class EnumerationStore(object):
+    """
+        Enumeration state of the instances explained so far: the MCSes and
+        AXps found and whether the enumeration was exhausted. A later run
+        asking for more explanations (a larger --xnum) starts from there
+        instead of from scratch. States are kept in a subdirectory named
+        after the hash of the model and of the options the enumeration
+        depends on (but not of --xnum), one file per instance.
+    """
+
+    def __init__(self, dirname, options):
+        """
+            Constructor.
+        """
+
+        self.path = os.path.join(dirname, digest(options, (options.encode,
+            options.xtype, options.smallest)))
+        os.makedirs(self.path, exist_ok=True)
+
+    def fname(self, instance):
+        """
+            File storing the state of an instance.
+        """
+
+        return os.path.join(self.path, hashlib.sha1(repr([float(v) for v in instance]).encode('utf-8')).hexdigest() + '.pkl')
+
+    def load(self, instance):
+        """
+            State of an instance, or None if it was never explained.
+        """
+
+        if not os.path.exists(self.fname(instance)):
+            return None
+
+        with open(self.fname(instance), 'rb') as fp:
+            return pickle.load(fp)
+
+    def save(self, instance, state):
+        """
+            Record the state of an instance.
+        """
+
+        dump(state, self.fname(instance))
+
+
+#
+#==============================================================================
+class CoreStore(object):
+    """
+        Unit cores found by the internal MaxSAT oracles (ERC2) for the full
+        instances, with their reasons, so that a later run explaining the
+        same instances does not detect them again. They are kept in a
+        subdirectory named after the hash of the model and of the options
+        the encoding and the oracles depend on, one file per oracle (i.e.
+        pair of classes) and instance.
+    """
+
+    def __init__(self, dirname, options):
+        """
+            Constructor.
+        """
+
+        self.path = os.path.join(dirname, digest(options, (options.encode,
+            options.cardenc, options.relax, options.solver, options.am1,
+            options.exhaust, options.minz, options.trim)))
+        os.makedirs(self.path, exist_ok=True)
+
+    def fname(self, name, assumps):
+        """
+            File storing the cores of an oracle for an instance (given by
+            its assumption literals).
+        """
+
+        return os.path.join(self.path, '{0}-{1}.pkl'.format(name,
+            hashlib.sha1(repr(sorted(assumps)).encode('utf-8')).hexdigest()))
+
+    def load(self, name, assumps):
+        """
+            Cores of an oracle for an instance, or None if unknown.
+        """
+
+        if not os.path.exists(self.fname(name, assumps)):
+            return None
+
+        with open(self.fname(name, assumps), 'rb') as fp:
+            return pickle.load(fp)
+
+    def save(self, name, assumps, cores):
+        """
+            Record the cores of an oracle for an instance.
+        """
+
+        dump(cores, self.fname(name, assumps))
+
+
+#
+#==============================================================================
+def digest(options, params):
+    """
+        Hash of the model (and attack layer) in use and of the given
+        parameters.
+    """
+
+    h = hashlib.sha1()
+
+    for fname in [options.files[0]] + ([options.attack] if options.attack else []):
+        with open(fname, 'rb') as fp:
+            for chunk in iter(lambda: fp.read(1 << 20), b''):
+                h.update(chunk)
+
+    h.update(repr(params).encode('utf-8'))
+
+    return h.hexdigest()
+
+
+#
+#==============================================================================
+def dump(obj, fname):
+    """
+        Pickle an object into a file atomically.
+    """
+
+    tmp = '{0}.{1}.tmp'.format(fname, os.getpid())
+    with open(tmp, 'wb') as fp:
+        pickle.dump(obj, fp)
+
+    os.rename(tmp, fname)
@@ -11,26 +11,15 @@
 #
 #==============================================================================
 from __future__ import print_function
-from .validate import SMTValidator
-from .encode import SMTEncoder, MXEncoder
-from .explain import SMTExplainer, MXExplainer
 import numpy as np
 import os
 import resource
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import sklearn
-# print('The scikit-learn version is {}.'.format(sklearn.__version__))
-
-from  sklearn.preprocessing import OneHotEncoder
 import sys
 from six.moves import range
-from .tree import TreeEnsemble
-import xgboost as xgb
-from xgboost import XGBClassifier, Booster
 import pickle
 
-import yaml
+# the reasoners, sklearn, xgboost and yaml are imported
+# only by the methods (i.e. the modes) that need them
 np.random.seed(1)
 
 #
@@ -59,6 +48,9 @@ class XGBooster(object):
 
 
         if from_data:
+            from sklearn.model_selection import train_test_split
+            from xgboost import XGBClassifier
+
             self.use_categorical = self.options.use_categorical
             # saving data
             self.data = from_data
@@ -91,6 +83,10 @@ class XGBooster(object):
             param_dist = {'n_estimators':self.options.n_estimators,
                       'max_depth':self.options.maxdepth,'random_state': 10, 'seed': 10}
 
+            if self.options.threads:
+                # models trained side by side must not oversubscribe the cores
+                param_dist['n_jobs'] = self.options.threads
+
             if(self.num_class == 2):
                 param_dist['objective'] = 'binary:logistic'
 
@@ -120,6 +116,8 @@ class XGBooster(object):
                 # this is a set of checks to make sure that we use the same as anchor encoding
                 cat_names = sorted(self.categorical_names.keys())
                 assert(cat_names == self.categorical_features)
+
+                from sklearn.preprocessing import OneHotEncoder
                 self.encoder = {}
                 for i in self.categorical_features:
                     self.encoder.update({i: OneHotEncoder(categories='auto', sparse=False)})#,
@@ -141,6 +139,8 @@ class XGBooster(object):
             # load model
 
         elif from_encoding:
+            from .encode import SMTEncoder, MXEncoder
+
             self.use_categorical = self.options.use_categorical
             fname = from_encoding
 
@@ -157,6 +157,8 @@ class XGBooster(object):
                         self.num_class = enc.access()
 
         if options.attack:
+            import yaml
+
             config=None
             with open(options.attack, 'r') as fp:
                 # parse yaml file and extract bias/unbiased features
@@ -261,6 +263,8 @@ class XGBooster(object):
         self.pickle_save_file(filename_data, samples)
 
     def load_datainfo(self, filename):
+        from xgboost import XGBClassifier
+
         print("loading model from ", filename)
         param_dist = {'n_estimators': self.options.n_estimators,
                       'max_depth': self.options.maxdepth, 'random_state': 10, 'seed': 10}
@@ -334,9 +338,18 @@ class XGBooster(object):
             Encode a tree ensemble trained previously.
         """
 
+        from .encode import SMTEncoder, MXEncoder
+
         if self.options.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa'):
             encoder = MXEncoder(self.model, self.feature_names, self.num_class, self)
             self.mxe = encoder
+
+            # binary encodings are kept under a hash of the booster and of the
+            # encoding options, and memory-mapped instead of being rebuilt
+            encdir = '{0}.enc-{1}'.format(self.basename, encoder.digest())
+            if os.path.isdir(encdir):
+                self.enc, self.intvs, self.imaps, self.ivars = encoder.load_bin(encdir)
+                return
         else:  # smt or smtbool
             encoder = SMTEncoder(self.model, self.feature_names, self.num_class, self)
         self.enc, self.intvs, self.imaps, self.ivars = encoder.encode()
@@ -346,6 +359,9 @@ class XGBooster(object):
 
         encoder.save_to(self.encfile)
 
+        if self.options.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa'):
+            encoder.save_bin(encdir)
+
     def explain(self, sample, use_lime=False, use_anchor=False, use_shap=False,
             expl_ext=None, prefer_ext=False, nof_feats=5,writer=None,attack=False):
         """
@@ -362,27 +378,90 @@ class XGBooster(object):
         elif use_shap:
             expl = use_shap(self, sample=sample, nb_features_in_exp=nof_feats,attack=attack)
         else:
-            if 'x' not in dir(self):
-                if self.options.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa'):
-                    self.x = MXExplainer(self.enc, self.intvs, self.imaps,
-                            self.ivars, self.feature_names, self.num_class,
-                            self.options, self)
-                else:
-                    self.x = SMTExplainer(self.enc, self.intvs, self.imaps,
-                            self.ivars, self.feature_names, self.num_class,
-                            self.options, self)
+            self.init_explainer()
+
+            # instances falling into the same intervals share explanations
+            sig = None
+            if self.options.xcache and self.intvs:
+                if 'xcache' not in dir(self):
+                    from .xcache import ExplanationCache
+                    self.xcache = ExplanationCache(self.options.xcache, self.options)
+
+                sig = self.signature(sample)
+                expl = self.xcache.get(sig)
+
+                if expl is not None:
+                    self.x.calls = 0
+                    self.x.complete = True
+                    self.x.stats.reset()
+                    return expl
+
             y_pred = self.model.predict(self.transform(np.array([sample])))[0]
             expl = self.x.explain(np.array(sample), self.options.smallest,
                     expl_ext, prefer_ext, label=y_pred)
 
+            # explanations cut short by a budget are not cached
+            if sig is not None and ('complete' not in dir(self.x) or self.x.complete):
+                self.xcache.put(sig, expl)
+
         # returning the explanation
         return expl
 
+    def iter_explanations(self, sample):
+        """
+            Explanations of a sample computed by the reasoning-based
+            explainer, yielded one by one as soon as they are found.
+        """
+
+        self.init_explainer()
+
+        y_pred = self.model.predict(self.transform(np.array([sample])))[0]
+        return self.x.iter_explanations(np.array(sample), self.options.smallest,
+                label=y_pred)
+
+    def init_explainer(self):
+        """
+            Create the reasoning-based explainer if it does not exist yet.
+        """
+
+        if 'x' not in dir(self):
+            from .explain import SMTExplainer, MXExplainer
+
+            if self.options.encode in ('mx', 'mxe', 'maxsat', 'mxint', 'mxa'):
+                self.x = MXExplainer(self.enc, self.intvs, self.imaps,
+                        self.ivars, self.feature_names, self.num_class,
+                        self.options, self)
+            else:
+                self.x = SMTExplainer(self.enc, self.intvs, self.imaps,
+                        self.ivars, self.feature_names, self.num_class,
+                        self.options, self)
+
+    def signature(self, sample):
+        """
+            Indices of the intervals the (used) feature values of a sample
+            fall into.
+        """
+
+        sig = []
+
+        sample_internal = list(self.transform(np.array(sample))[0])
+        for feat, fval in zip(self.extended_feature_names_as_array_strings, sample_internal):
+            if feat in self.intvs:
+                for i, ub in enumerate(self.intvs[feat]):
+                    if ub == '+' or fval < ub:
+                        sig.append(i)
+                        break
+
+        return tuple(sig)
+
     def validate(self, sample, expl):
         """
             Make an attempt to show that a given explanation is optimistic.
         """
 
+        from .encode import SMTEncoder
+        from .validate import SMTValidator
+
         # there must exist an encoding
         if 'enc' not in dir(self):
             encoder = SMTEncoder(self.model, self.feature_names, self.num_class,
@@ -516,6 +595,8 @@ class XGBooster(object):
             Build an ensemble of trees.
         """
 
+        from .tree import TreeEnsemble
+
         if (outfile is None):
             outfile = self.modfile
         else:
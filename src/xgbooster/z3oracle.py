@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+##
+## z3oracle.py
+##
+##  Created on: Oct 17, 2026
+##
+
+#
+#==============================================================================
+from fractions import Fraction
+from pysmt.shortcuts import get_env
+from pysmt.solvers.z3 import Z3Converter
+import z3
+
+
+#
+#==============================================================================
+class Z3Oracle(object):
+    """
+        A Z3 oracle with the (small) part of PySMT's solver interface used
+        by SMTExplainer. Formulas are still built by PySMT but each of them
+        is converted to Z3 only once, so the hypotheses and selectors used
+        as assumptions in every call cost nothing to pass to Z3, and models
+        are read directly from Z3.
+    """
+
+    def __init__(self):
+        """
+            Constructor.
+        """
+
+        self.z3 = z3.Solver()
+        self.z3.set('model', True)
+
+        self.conv = Z3Converter(get_env(), self.z3.ctx)
+
+        # PySMT terms converted so far
+        self.terms = {}
+
+        # enumerate_contrastive() maps the unsat
+        # core back through oracle.converter.convert()
+        self.converter = self
+
+    def convert(self, term):
+        """
+            Z3 counterpart of a PySMT term.
+        """
+
+        if term not in self.terms:
+            self.terms[term] = self.conv.convert(term)
+
+        return self.terms[term]
+
+    def add_assertion(self, formula):
+        """
+            Add a formula to the oracle.
+        """
+
+        self.z3.add(self.convert(formula))
+
+    def solve(self, assumptions=[]):
+        """
+            Check satisfiability under the given assumptions.
+        """
+
+        res = self.z3.check(*[self.convert(a) for a in assumptions])
+        assert res != z3.unknown, 'Z3 returned unknown: {0}'.format(self.z3.reason_unknown())
+
+        return res == z3.sat
+
+    def get_model(self):
+        """
+            The model of the last satisfiable call.
+        """
+
+        return Z3OracleModel(self, self.z3.model())
+
+    def push(self):
+        """
+            Open a backtracking point.
+        """
+
+        self.z3.push()
+
+    def pop(self):
+        """
+            Backtrack to the last backtracking point.
+        """
+
+        self.z3.pop()
+
+    def exit(self):
+        """
+            Destroy the oracle.
+        """
+
+        self.terms = {}
+        self.z3 = None
+
+
+#
+#==============================================================================
+class Z3OracleModel(object):
+    """
+        A Z3 model queried with PySMT terms.
+    """
+
+    def __init__(self, oracle, model):
+        """
+            Constructor.
+        """
+
+        self.oracle = oracle
+        self.model = model
+
+    def get_py_value(self, term):
+        """
+            Value of a term as a Python bool, int or Fraction (as done by
+            PySMT's get_py_value()).
+        """
+
+        val = self.model.eval(self.oracle.convert(term), model_completion=True)
+
+        if z3.is_bool(val):
+            return z3.is_true(val)
+        elif z3.is_int_value(val):
+            return val.as_long()
+        elif z3.is_rational_value(val):
+            return Fraction(val.numerator_as_long(), val.denominator_as_long())
+
+        return Fraction(val.approx(20).as_fraction())
+
+    def __str__(self):
+        """
+            String representation.
+        """
+
+        return str(self.model)
@@ -15,13 +15,10 @@
 
 from __future__ import print_function
 from aggrxp.src.data import Data
-from anchor_wrap import anchor_call
-from lime_wrap import lime_call
-from shap_wrap import shap_call
 from options import Options
 import os
 import sys
-from xgbooster import XGBooster, preprocess_dataset
+from xgbooster import XGBooster
 import numpy  as np
 import random
 random.seed(1)
@@ -52,6 +49,7 @@ if __name__ == '__main__':
     show_info()
 
     if (options.preprocess_categorical):
+        from xgbooster import preprocess_dataset
         preprocess_dataset(options.files[0], options.preprocess_categorical_files)
         exit()
 
@@ -97,12 +95,20 @@ if __name__ == '__main__':
             if not options.limefeats:
                 options.limefeats = len(data.names) - 1
 
-            # explain using anchor or the abduction-based approach
+            # explain using anchor or the abduction-based approach;
+            # the wrappers are imported only if selected
+            use_lime, use_anchor, use_shap = None, None, None
+            if options.uselime:
+                from lime_wrap import lime_call as use_lime
+            if options.useanchor:
+                from anchor_wrap import anchor_call as use_anchor
+            if options.useshap:
+                from shap_wrap import shap_call as use_shap
 
             expl = xgb.explain(options.explain,
-                    use_lime=lime_call if options.uselime else None,
-                    use_anchor=anchor_call if options.useanchor else None,
-                    use_shap=shap_call if options.useshap else None,
+                    use_lime=use_lime,
+                    use_anchor=use_anchor,
+                    use_shap=use_shap,
                     nof_feats = options.limefeats)
 
 
@@ -9,19 +9,17 @@
 ##
 
 #
-import resource
 #==============================================================================
 # from __future__ import print_function
 from aggrxp.src.data import Data
-from anchor_wrap import anchor_call
-from lime_wrap import lime_call
-from shap_wrap import shap_call
+from explog import ExplanationLog
 from options import Options
 import joblib
+import multiprocessing
 import numpy as np
 import os
 import sys
-from xgbooster import XGBooster, preprocess_dataset
+from xgbooster import ExplainSession, XGBooster
 
 
 #
@@ -37,64 +35,65 @@ def show_info():
     print('c            Nina Narodytska    [email:narodytska@vmware.com]')
     print('')
 
-def multi_run_wrapper(args):
-   return compute(*args)
-
-
-def compute(point,options,idx,true_y):
-
-
-    point_ = [round(float(x),2) for x in point]
-    if options.uselime or options.useanchor or options.useshap:
-        xgb = XGBooster(options, from_model=options.files[0], categorical_features=categorical_feature_names)
-    else:
-        # abduction-based approach requires an encoding
-        xgb = XGBooster(options, from_model=options.files[0], categorical_features=categorical_feature_names)
-
+def get_explainers(options):
+    """
+        LIME, Anchor and SHAP wrappers. Each of them (and the package
+        it wraps) is imported only if selected.
+    """
 
-    if options.explain:
-        options.explain = point_
+    use_lime, use_anchor, use_shap = None, None, None
 
+    if options.uselime:
+        from lime_wrap import lime_call as use_lime
+    if options.useanchor:
+        from anchor_wrap import anchor_call as use_anchor
+    if options.useshap:
+        from shap_wrap import shap_call as use_shap
 
-    if options.encode:
-        # if not xgb:
+    return use_lime, use_anchor, use_shap
 
-        # encode it and save the encoding to another file
-        xgb.encode(test_on=point_)
+def get_categorical_features(fname):
+    """
+        Categorical features of the datasets used in the attacks.
+    """
 
+    if "compas" in fname:
+        return ['unrelated_column_one', 'unrelated_column_two',
+                'c_charge_degree_F','c_charge_degree_M',
+                'two_year_recid', 'race', "sex_Male",
+                "sex_Female"]
 
-    feat_sample_exp = np.expand_dims(point_, axis=0)
-    feat_sample_tr = xgb.transform(feat_sample_exp)
+    elif "german" in fname:
+        return ['Gender', 'ForeignWorker', 'Single', 'HasTelephone', 'CheckingAccountBalance_geq_0',
+           'CheckingAccountBalance_geq_200', 'SavingsAccountBalance_geq_100', 'SavingsAccountBalance_geq_500',
+           'MissedPayments', 'NoCurrentLoan', 'CriticalAccountOrLoansElsewhere', 'OtherLoansAtBank',
+           'OtherLoansAtStore', 'HasCoapplicant', 'HasGuarantor', 'OwnsHouse', 'RentsHouse', 'Unemployed',
+           'YearsAtCurrentJob_lt_1', 'YearsAtCurrentJob_geq_4', 'JobClassIsSkilled','LoanRateAsPercentOfIncome']
 
-    if options.attack:
-        y_pred = xgb.predict(feat_sample_exp)[0]
-    else:
-        y_pred = xgb.model.predict(feat_sample_tr)[0]
+    print("no categorical features found in lime attack")
+    return []
 
-    time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-           resource.getrusage(resource.RUSAGE_SELF).ru_utime
+def multi_run_wrapper(args):
+   return compute(*args)
 
 
-    expl_ = xgb.explain(point_,
-                       use_lime=lime_call if options.uselime else None,
-                       use_anchor=anchor_call if options.useanchor else None,
-                       use_shap=shap_call if options.useshap else None,
-                       nof_feats=options.limefeats,attack=options.attack)
+# explanation session of this process (each pool worker gets its own)
+session = None
 
+def compute(point,options,idx,true_y):
+    global session
 
-    time = resource.getrusage(resource.RUSAGE_CHILDREN).ru_utime + \
-           resource.getrusage(resource.RUSAGE_SELF).ru_utime - time
-    if options.uselime==True or options.useshap==True:
-        expl = expl_[0]
-        y_pred =  expl_[1]
+    if session is None:
+        # the model, its encoding and the explainer are loaded only once
+        session = ExplainSession(options, options.files[0], categorical_features=categorical_feature_names)
 
-    else:
-        expl = expl_
+    use_lime, use_anchor, use_shap = get_explainers(options)
 
-    if (options.uselime or options.useanchor or options.useshap) and options.validate:
-        xgb.validate(options.explain, expl)
+    expl, y_pred, time = session.explain(point, use_lime=use_lime,
+                       use_anchor=use_anchor, use_shap=use_shap,
+                       nof_feats=options.limefeats)
 
-    return (point,idx,expl,y_pred,true_y,time)
+    return (point,idx,expl,y_pred,true_y,time), session.info
 
 #
 
@@ -113,6 +112,7 @@ if __name__ == '__main__':
     show_info()
 
     if (options.preprocess_categorical):
+        from xgbooster import preprocess_dataset
         preprocess_dataset(options.files[0], options.preprocess_categorical_files)
         exit()
 
@@ -164,24 +164,7 @@ if __name__ == '__main__':
             idx = 0
             all_expl=[]
 
-            # if options.attack:
-            if "compas" in options.files[0]:
-                categorical_feature_names = ['unrelated_column_one', 'unrelated_column_two',
-                 'c_charge_degree_F','c_charge_degree_M',
-                 'two_year_recid', 'race', "sex_Male",
-                "sex_Female"]
-
-            elif "german" in options.files[0]:
-                categorical_feature_names= categorical = ['Gender', 'ForeignWorker', 'Single', 'HasTelephone', 'CheckingAccountBalance_geq_0',
-           'CheckingAccountBalance_geq_200', 'SavingsAccountBalance_geq_100', 'SavingsAccountBalance_geq_500',
-           'MissedPayments', 'NoCurrentLoan', 'CriticalAccountOrLoansElsewhere', 'OtherLoansAtBank',
-           'OtherLoansAtStore', 'HasCoapplicant', 'HasGuarantor', 'OwnsHouse', 'RentsHouse', 'Unemployed',
-           'YearsAtCurrentJob_lt_1', 'YearsAtCurrentJob_geq_4', 'JobClassIsSkilled','LoanRateAsPercentOfIncome']
-
-
-
-            else:
-                print("no categorical features found in lime attack")
+            categorical_feature_names = get_categorical_features(options.files[0])
 
             if not xgb:
                 if options.uselime or options.useanchor or options.useshap:
@@ -219,25 +202,42 @@ if __name__ == '__main__':
 
             options.limefeats = len(data.names) - 1
 
-            points = []
-            result = []
+            # every explained point is appended to the log, which
+            # is compacted into the *_expls.pkl layout in the end
+            log = ExplanationLog(dirname + "/" + type + "_expls.log")
+            done = log.done() if options.resume else set()
+            log.open(resume=options.resume)
+
+            tasks = []
 
             for point in xgb_test.X:
+                if idx not in done:
+                    tasks.append((point,options,idx,xgb_test.Y[idx]))
 
+                idx+=1
 
-                for jdx in range(int(xgb_test.weights[idx])):
-                    points.append((point,options,idx,fname,dirname,xgb_test.Y[idx]))
-                    result.append(multi_run_wrapper((point,options,idx,xgb_test.Y[idx])))
+            if options.jobs > 1:
+                # workers are forked, so they inherit categorical_feature_names;
+                # imap() returns the results in the order of the tasks, i.e. by idx
+                pool = multiprocessing.Pool(processes=options.jobs)
+                results = pool.imap(multi_run_wrapper, tasks)
+            else:
+                pool = None
+                results = map(multi_run_wrapper, tasks)
 
-                idx+=1
+            # duplicate rows are merged by Data, so each is explained once
+            # and replicated according to its weight by log.compact()
+            for res, info in results:
+                log.append(res[1], xgb_test.weights[res[1]], res, info)
 
-                if idx%20==0:
-                    joblib.dump(result, dirname + "/" + type + "_expls.pkl")
-                    joblib.dump(points, dirname + "/" + type + "_points.pkl")
+            if pool:
+                pool.close()
+                pool.join()
 
-            all_expl = result
-            joblib.dump(all_expl,dirname + "/"  + type+ "_expls.pkl")
-            joblib.dump(points, dirname + "/" + type + "_points.pkl")
+            log.close()
+            all_expl = log.compact(dirname + "/"  + type+ "_expls.pkl",
+                    dirname + "/" + type + "_points.pkl", options,
+                    dirname + "/" + type + "_info.json")
 
         else:
             if not xgb:
@@ -254,10 +254,10 @@ if __name__ == '__main__':
                 except:
                     options.limefeats = xgb.X_test.shape[0]
 
-            expl = xgb.explain(options.explain,
-                               use_lime=lime_call if options.uselime else None,
-                               use_anchor=anchor_call if options.useanchor else None,
-                               use_shap=shap_call if options.useshap else None,
+            use_lime, use_anchor, use_shap = get_explainers(options)
+
+            expl = xgb.explain(options.explain, use_lime=use_lime,
+                               use_anchor=use_anchor, use_shap=use_shap,
                                nof_feats=options.limefeats)
 
             if (options.uselime or options.useanchor or options.useshap) and options.validate:
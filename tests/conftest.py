@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(root, 'src'))
+
+from data import Data
+import numpy as np
+from options import Options
+from xgbooster import ExplainSession, XGBooster
+
+
+DATASET = os.path.join(root, 'datasets', 'compas_shapood', 'compas_shapood.csv')
+TESTSET = os.path.join(root, 'datasets', 'compas_shapood', 'compas_shapood_test.csv')
+ATTACK = os.path.join(root, 'datasets', 'compas_shapood', 'config_num.yml')
+
+
+@pytest.fixture(scope='session')
+def model(tmp_path_factory):
+    # a small model (10 trees) of the SHAP attack on COMPAS
+    output = str(tmp_path_factory.mktemp('temp'))
+    options = Options(['xreason.py', '-t', '-n', '10', '-o', output, DATASET])
+
+    data = Data(filename=DATASET, mapfile=options.mapfile,
+                separator=options.separator, use_categorical=options.use_categorical)
+    xgb = XGBooster(options, from_data=data)
+    xgb.train()
+
+    return xgb.modfile
+
+
+@pytest.fixture(scope='session')
+def points():
+    data = Data(filename=TESTSET, mapfile=None, separator=',', use_categorical=False)
+    return np.asarray(data.samps, dtype=np.float32)[:10, 0:len(data.names) - 1]
+
+
+def explain(model, points, argv, output):
+    """
+        Explanations (sorted lists of feature ids, in a sorted list) and
+        completeness of every point, computed by a fresh session.
+    """
+
+    options = Options(['xreason_agg.py', '-o', output] + argv + [model, TESTSET])
+    session = ExplainSession(options, model)
+
+    result = []
+    for point in points:
+        expl, _, _ = session.explain(point)
+        result.append((sorted([sorted(e) for e in expl]), session.info['complete']))
+
+    return result
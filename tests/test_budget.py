@@ -0,0 +1,24 @@
+from conftest import explain
+
+
+def test_contrastive_budget_exhausted(model, points, tmp_path):
+    # the budget runs out before the first CXp of every point
+    argv = ['-e', 'smt', '-s', 'z3', '-X', 'con', '--xnum', '5', '--xcalls', '1']
+
+    assert explain(model, points, argv, str(tmp_path)) == [([], False)] * len(points)
+
+
+def test_contrastive_budget_not_exhausted(model, points, tmp_path):
+    argv = ['-e', 'smt', '-s', 'z3', '-X', 'con', '--xnum', '5']
+
+    assert all([complete and expls for expls, complete in explain(model, points, argv, str(tmp_path))])
+
+
+def test_abductive_budget_exhausted(model, points, tmp_path):
+    argv = ['-e', 'smt', '-s', 'z3', '--xnum', 'all']
+    full = explain(model, points, argv, str(tmp_path))
+
+    # the AXps found within the budget are among all the AXps
+    for (expls, complete), (axps, _) in zip(explain(model, points, argv + ['--xcalls', '2'], str(tmp_path)), full):
+        assert not complete
+        assert all([expl in axps for expl in expls])
@@ -0,0 +1,17 @@
+import os
+
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('attack', [[], ['-a', ATTACK]], ids=['plain', 'attack'])
+def test_coredb(model, points, tmp_path, attack):
+    argv = ['-e', 'mx', '-s', 'g3', '--xnum', 'all'] + attack
+    coredb = str(tmp_path / 'coredb')
+    fresh = explain(model, points, argv, str(tmp_path))
+
+    # filled by the first run, read by the second one
+    assert explain(model, points, argv + ['--coredb', coredb], str(tmp_path)) == fresh
+    assert os.listdir(coredb)
+    assert explain(model, points, argv + ['--coredb', coredb], str(tmp_path)) == fresh
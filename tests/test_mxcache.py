@@ -0,0 +1,39 @@
+import glob
+import os
+
+import pytest
+
+from conftest import ATTACK, TESTSET
+from options import Options
+from xgbooster import ExplainSession
+from xgbooster.encode import MXEncoder
+
+
+def encoding(xgb):
+    # the class formulas, leaves and trees, and the interval tables
+    enc = [([[int(l) for l in cl] for cl in xgb.enc[clid].formula.clauses],
+        xgb.enc[clid].formula.nv, [(int(l), w) for l, w in xgb.enc[clid].leaves],
+        [tuple(t) for t in xgb.enc[clid].trees]) for clid in range(xgb.num_class)]
+
+    return enc, xgb.intvs, xgb.imaps, xgb.ivars
+
+
+def explain(model, points, argv, output):
+    session = ExplainSession(Options(['xreason_agg.py', '-o', output] + argv + [model, TESTSET]), model)
+    expls = [sorted([sorted(e) for e in session.explain(point)[0]]) for point in points]
+
+    return expls, encoding(session.xgb)
+
+
+@pytest.mark.parametrize('argv', [['-e', 'mx', '-s', 'g3', '--xnum', 'all'],
+    ['-e', 'mx', '-s', 'g3', '--xnum', 'all', '-a', ATTACK]], ids=['mx', 'mx-attack'])
+def test_binary_cache(model, points, tmp_path, argv, monkeypatch):
+    fresh = explain(model, points, argv, str(tmp_path))
+    assert glob.glob(os.path.join(str(tmp_path), '*', '*.enc-*'))
+
+    # the second session must load the encoding instead of building it
+    def fail(self):
+        raise AssertionError('The encoding is built again')
+    monkeypatch.setattr(MXEncoder, 'encode', fail)
+
+    assert explain(model, points, argv, str(tmp_path)) == fresh
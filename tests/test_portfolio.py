@@ -0,0 +1,20 @@
+from conftest import ATTACK, explain
+
+
+def test_portfolio_equals_serial(model, points, tmp_path):
+    argv = ['-e', 'smt', '-s', 'z3', '--xnum', 'all']
+    serial = explain(model, points, argv, str(tmp_path))
+
+    assert all([complete and expls for expls, complete in serial])
+    assert explain(model, points, argv + ['--xjobs', '2'], str(tmp_path)) == serial
+
+
+def test_portfolio_equals_serial_attack(model, points, tmp_path):
+    # the hypotheses do not always fix the label of the attack layer,
+    # which the workers must take from the coordinator
+    argv = ['-e', 'smt', '-s', 'z3', '--xnum', 'all', '-a', ATTACK]
+    serial = explain(model, points, argv, str(tmp_path))
+
+    assert all([complete and expls for expls, complete in serial])
+    for run in range(3):
+        assert explain(model, points, argv + ['--xjobs', '2'], str(tmp_path)) == serial
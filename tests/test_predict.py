@@ -0,0 +1,13 @@
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('attack', [[], ['-a', ATTACK]], ids=['plain', 'attack'])
+def test_check_predict(model, points, tmp_path, attack):
+    # the vectorized predictions are checked against the SAT-based ones
+    argv = ['-e', 'mx', '-s', 'g3', '--xnum', 'all'] + attack
+    smt = ['-e', 'smt', '-s', 'z3', '--xnum', 'all'] + attack
+
+    assert explain(model, points, argv + ['--check-predict'], str(tmp_path)) == \
+            explain(model, points, smt, str(tmp_path))
@@ -0,0 +1,13 @@
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('attack', [[], ['-a', ATTACK]], ids=['plain', 'attack'])
+def test_warm(model, points, tmp_path, attack):
+    argv = ['-e', 'smt', '-s', 'z3', '--xnum', 'all'] + attack
+    cold = explain(model, points, argv, str(tmp_path))
+
+    # the seeds only speed the enumeration up
+    for warm in ('1', '5'):
+        assert explain(model, points, argv + ['--warm', warm], str(tmp_path)) == cold
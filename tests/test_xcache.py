@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('argv', [['-e', 'smtbool', '-s', 'z3'], ['-e', 'mx', '-s', 'g3'],
+    ['-e', 'mx', '-s', 'g3', '-a', ATTACK]], ids=['smtbool', 'mx', 'mx-attack'])
+def test_xcache(model, points, tmp_path, argv):
+    argv = argv + ['--xnum', 'all']
+    xcache = str(tmp_path / 'xcache')
+    fresh = explain(model, points, argv, str(tmp_path))
+
+    # filled by the first run, read by the second one
+    assert explain(model, points, argv + ['--xcache', xcache], str(tmp_path)) == fresh
+    assert os.listdir(xcache)
+    assert explain(model, points, argv + ['--xcache', xcache], str(tmp_path)) == fresh
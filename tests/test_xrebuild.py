@@ -0,0 +1,13 @@
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('attack', [[], ['-a', ATTACK]], ids=['plain', 'attack'])
+def test_xrebuild(model, points, tmp_path, attack):
+    argv = ['-e', 'smt', '-s', 'z3', '--xnum', 'all'] + attack
+    serial = explain(model, points, argv, str(tmp_path))
+
+    # rebuilding the oracle does not change the AXps
+    for every in ('1', '3'):
+        assert explain(model, points, argv + ['--xrebuild', every], str(tmp_path)) == serial
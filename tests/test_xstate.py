@@ -0,0 +1,20 @@
+import os
+
+import pytest
+
+from conftest import ATTACK, explain
+
+
+@pytest.mark.parametrize('argv', [['-e', 'smt', '-s', 'z3'], ['-e', 'mx', '-s', 'g3'],
+    ['-e', 'mx', '-s', 'g3', '-a', ATTACK]], ids=['smt', 'mx', 'mx-attack'])
+def test_xstate_resume(model, points, tmp_path, argv):
+    xstate = str(tmp_path / 'xstate')
+    single = explain(model, points, argv + ['--xnum', '50'], str(tmp_path))
+
+    first = explain(model, points, argv + ['--xnum', '1', '--xstate', xstate], str(tmp_path))
+    assert all([len(expls) == 1 for expls, complete in first])
+    assert os.listdir(xstate)
+
+    # resumed from the state of the first run, and then read from it
+    assert explain(model, points, argv + ['--xnum', '50', '--xstate', xstate], str(tmp_path)) == single
+    assert explain(model, points, argv + ['--xnum', '50', '--xstate', xstate], str(tmp_path)) == single